@@ -34,11 +34,16 @@ urlpatterns = [
     path("api/signup_mongo/", views.signup_mongo, name="signup_mongo"),
     path("api/recommend/", views.recommend, name="recommend"),
     path("api/instant_outfits/", views.instant_outfits, name="instant_outfits"),
+    path("api/swipe_session/", views.create_swipe_session, name="swipe_session"),
     path("api/generate/", views.generate_outfits, name="generate_outfits"),
     path("quiz/generate/", views.generate_outfits, name="quiz_generate"),
+    path("api/generate/stream/", views.generate_outfits_stream, name="generate_outfits_stream"),
+    path("api/recommend/stream/", views.recommend_stream, name="recommend_stream"),
     path("api/save_image/", views.save_image, name="save_image"),
+    path("api/wardrobe_batch/", views.wardrobe_batch, name="wardrobe_batch"),
     path("api/get_wardrobe/", views.get_wardrobe, name="get_wardrobe"),
     path("api/weather_status/", views.weather_status, name="weather_status"),
+    path("api/metrics/", views.service_metrics, name="service_metrics"),
     path("api/early_access/", views.register_early_access, name="early_access"),
     path("api/early_access/list/", views.list_early_access, name="early_access_list"),
     path("api/early_access/export/", views.export_early_access, name="early_access_export"),
@@ -0,0 +1,64 @@
+"""
+A document count that is read from memory and refreshed in the background.
+
+Dashboards show totals on every page load; recounting each time costs a
+collection scan.  `CachedCount` counts once, serves the cached number, and
+when it is older than `ttl` starts a single background recount while still
+answering with the previous value.  Local writes can adjust it immediately.
+"""
+import threading
+import time
+
+
+class CachedCount:
+    def __init__(self, count, ttl: float = 60.0):
+        """`count()` returns the current total (e.g. `estimated_document_count`)."""
+        self._count = count
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value: int | None = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+
+    def _refresh(self) -> None:
+        try:
+            value = int(self._count())
+        except Exception as exc:
+            print(f"[DEBUG] Count refresh failed: {exc}")
+            with self._lock:
+                self._refreshing = False
+            return
+        with self._lock:
+            self._value = value
+            self._fetched_at = time.monotonic()
+            self._refreshing = False
+
+    def get(self) -> int:
+        with self._lock:
+            value = self._value
+            stale = time.monotonic() - self._fetched_at >= self.ttl
+            start = stale and value is not None and not self._refreshing
+            if start:
+                self._refreshing = True
+        if value is None:
+            self._refresh()
+            with self._lock:
+                return self._value or 0
+        if start:
+            threading.Thread(target=self._refresh, daemon=True).start()
+        return value
+
+    def adjust(self, delta: int) -> None:
+        """Account for a local insert/delete without waiting for the next recount."""
+        with self._lock:
+            if self._value is not None:
+                self._value = max(0, self._value + delta)
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = time.monotonic() - self._fetched_at if self._value is not None else None
+            return {
+                "value": self._value,
+                "age_seconds": round(age, 1) if age is not None else None,
+                "refreshing": self._refreshing,
+            }
@@ -0,0 +1,388 @@
+"""
+Process-local inverted tag index over the outfit catalog (`outfits.images`).
+
+Every catalog document gets a small integer id in recency order (older
+documents first), and each normalized tag maps to an `array('I')` of the ids
+carrying it.  Because new documents are always appended with the next id the
+posting arrays stay sorted, so "every required tag, newest first" is a walk
+over the shortest posting array backwards with `bisect` membership checks on
+the others.
+"""
+import bisect
+import heapq
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime
+
+from .image_variants import variant_filename, variant_specs
+
+
+def normalize_tags(tags) -> tuple[str, ...]:
+    """Lowercase, strip and intern string tags, dropping everything else."""
+    normalized = []
+    for tag in tags or []:
+        if not isinstance(tag, str):
+            continue
+        text = tag.strip().lower()
+        if text and text not in normalized:
+            normalized.append(sys.intern(text))
+    return tuple(normalized)
+
+
+class CatalogEntry:
+    """Compact view of one catalog document.
+
+    `image` and `source_url` are only stored when they differ from the URL
+    derived from the filename, which is the case for very few documents.
+    Variants are kept as a shared tuple of (width, format) pairs; their URLs
+    are derived from the filename too.
+    """
+
+    __slots__ = ("filename", "tags", "variants", "_image", "_source_url")
+
+    def __init__(self, filename: str, tags: tuple[str, ...], variants=(), image=None, source_url=None):
+        self.filename = filename
+        self.tags = tags
+        self.variants = variants
+        self._image = image
+        self._source_url = source_url
+
+    def as_doc(self, default_url) -> dict:
+        image = self._image or default_url(self.filename)
+        images = {"full": image}
+        if self.variants:
+            images["variants"] = [
+                {
+                    "url": default_url(variant_filename(self.filename, width, fmt)),
+                    "width": width,
+                    "format": fmt,
+                }
+                for width, fmt in self.variants
+            ]
+        return {
+            "filename": self.filename,
+            "images": images,
+            "tags": list(self.tags),
+            "source_url": self._source_url or image,
+        }
+
+
+class CatalogIndex:
+    PROJECTION = {
+        "filename": 1,
+        "tags": 1,
+        "images.full": 1,
+        "images.thumbnail": 1,
+        "images.variants": 1,
+        "image": 1,
+        "source_url": 1,
+        "created_at": 1,
+        "updated_at": 1,
+    }
+
+    def __init__(self, collection, resolve_url, default_url, refresh_interval: float = 60.0):
+        """
+        `resolve_url(doc)` returns the display URL for a raw document and
+        `default_url(filename)` the URL derived from the filename alone.
+        """
+        self._collection = collection
+        self._resolve_url = resolve_url
+        self._default_url = default_url
+        self._refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._entries: list[CatalogEntry] = []
+        self._postings: dict[str, array] = {}
+        self._ids_by_filename: dict[str, int] = {}
+        self._last_created_at: datetime | None = None
+        # Newest `created_at` read back from Mongo.  Only loads and refreshes
+        # advance it: a local `add_document` must not move the tail past
+        # older documents other workers wrote since the last refresh.
+        self._tail_created_at: datetime | None = None
+        # Newest `updated_at` read back (set by in-place edits such as
+        # `backfill_image_variants`); refreshes re-read anything newer.
+        self._tail_updated_at: datetime | None = None
+        self._last_refresh = 0.0
+        self._ready = threading.Event()
+        self._loading = False
+        self._refreshing = False
+
+    # --- Building ---
+    def _make_entry(self, doc: dict) -> CatalogEntry | None:
+        filename = doc.get("filename")
+        if not filename:
+            return None
+        image = self._resolve_url(doc)
+        if not image:
+            return None
+        default = self._default_url(filename)
+        source_url = doc.get("source_url") or image
+        images = doc.get("images") if isinstance(doc.get("images"), dict) else {}
+        variants = [
+            variant for variant in images.get("variants") or []
+            if isinstance(variant, dict)
+            and variant.get("url") == self._default_url(
+                variant_filename(filename, variant.get("width"), variant.get("format"))
+            )
+        ]
+        return CatalogEntry(
+            sys.intern(filename),
+            normalize_tags(doc.get("tags")),
+            variants=variant_specs(variants),
+            image=None if image == default else image,
+            source_url=None if source_url == image else source_url,
+        )
+
+    @staticmethod
+    def _append(entries, postings, ids_by_filename, entry: CatalogEntry) -> None:
+        if entry.filename in ids_by_filename:
+            return
+        doc_id = len(entries)
+        entries.append(entry)
+        ids_by_filename[entry.filename] = doc_id
+        for tag in entry.tags:
+            posting = postings.get(tag)
+            if posting is None:
+                posting = postings[tag] = array("I")
+            posting.append(doc_id)
+
+    @staticmethod
+    def _replace(entries, postings, ids_by_filename, entry: CatalogEntry) -> None:
+        """
+        Swap in a re-read document, keeping its id and recency position.
+        Changed posting arrays are copied, never edited in place, because
+        `iter_matches` keeps reading the old ones without the lock.
+        """
+        doc_id = ids_by_filename[entry.filename]
+        old_tags = set(entries[doc_id].tags)
+        entries[doc_id] = entry
+        for tag in old_tags - set(entry.tags):
+            posting = postings.get(tag)
+            if posting is None:
+                continue
+            position = bisect.bisect_left(posting, doc_id)
+            if position == len(posting) or posting[position] != doc_id:
+                continue
+            if len(posting) == 1:
+                del postings[tag]
+            else:
+                postings[tag] = posting[:position] + posting[position + 1:]
+        for tag in set(entry.tags) - old_tags:
+            posting = postings.get(tag)
+            if posting is None:
+                postings[tag] = array("I", [doc_id])
+                continue
+            position = bisect.bisect_left(posting, doc_id)
+            postings[tag] = posting[:position] + array("I", [doc_id]) + posting[position:]
+
+    def _load(self) -> None:
+        entries: list[CatalogEntry] = []
+        postings: dict[str, array] = {}
+        ids_by_filename: dict[str, int] = {}
+        last_created_at = None
+        last_updated_at = None
+        started = time.monotonic()
+        try:
+            cursor = (
+                self._collection.find({}, self.PROJECTION)
+                .sort("created_at", 1)
+                .batch_size(5000)
+            )
+            for doc in cursor:
+                entry = self._make_entry(doc)
+                if entry is not None:
+                    self._append(entries, postings, ids_by_filename, entry)
+                created_at = doc.get("created_at")
+                if isinstance(created_at, datetime):
+                    last_created_at = created_at
+                updated_at = doc.get("updated_at")
+                if isinstance(updated_at, datetime) and (
+                    last_updated_at is None or updated_at > last_updated_at
+                ):
+                    last_updated_at = updated_at
+        except Exception as exc:
+            print(f"[DEBUG] Catalog index load failed: {exc}")
+            with self._lock:
+                self._loading = False
+            return
+
+        with self._lock:
+            self._entries = entries
+            self._postings = postings
+            self._ids_by_filename = ids_by_filename
+            self._last_created_at = last_created_at
+            self._tail_created_at = last_created_at
+            self._tail_updated_at = last_updated_at
+            self._last_refresh = time.monotonic()
+            self._loading = False
+        self._ready.set()
+        print(
+            f"[DEBUG] Catalog index loaded {len(entries)} images / {len(postings)} tags "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+    def _refresh(self) -> None:
+        """
+        Append documents written by other processes since the last refresh
+        and re-read documents edited in place since then.
+        """
+        try:
+            with self._lock:
+                since = self._tail_created_at
+                updated_since = self._tail_updated_at
+            query = {"created_at": {"$gte": since}} if since else {}
+            cursor = self._collection.find(query, self.PROJECTION).sort("created_at", 1)
+            for doc in cursor:
+                self.add_document(doc)
+                created_at = doc.get("created_at")
+                if isinstance(created_at, datetime):
+                    with self._lock:
+                        if self._tail_created_at is None or created_at > self._tail_created_at:
+                            self._tail_created_at = created_at
+
+            query = {"updated_at": {"$gte": updated_since}} if updated_since else {"updated_at": {"$ne": None}}
+            for doc in self._collection.find(query, self.PROJECTION).sort("updated_at", 1):
+                entry = self._make_entry(doc)
+                with self._lock:
+                    if entry is not None:
+                        if entry.filename in self._ids_by_filename:
+                            self._replace(self._entries, self._postings, self._ids_by_filename, entry)
+                        else:
+                            self._append(self._entries, self._postings, self._ids_by_filename, entry)
+                    updated_at = doc.get("updated_at")
+                    if isinstance(updated_at, datetime) and (
+                        self._tail_updated_at is None or updated_at > self._tail_updated_at
+                    ):
+                        self._tail_updated_at = updated_at
+        except Exception as exc:
+            print(f"[DEBUG] Catalog index refresh failed: {exc}")
+        finally:
+            with self._lock:
+                self._last_refresh = time.monotonic()
+                self._refreshing = False
+
+    def add_document(self, doc: dict) -> None:
+        """Index a freshly written catalog document (no-op until loaded)."""
+        if not self._ready.is_set():
+            return
+        entry = self._make_entry(doc)
+        with self._lock:
+            if entry is not None:
+                self._append(self._entries, self._postings, self._ids_by_filename, entry)
+            created_at = doc.get("created_at")
+            if isinstance(created_at, datetime) and (
+                self._last_created_at is None or created_at > self._last_created_at
+            ):
+                self._last_created_at = created_at
+
+    def ensure_ready(self) -> bool:
+        """
+        Start loading (or a periodic tail refresh) in the background and
+        report whether the index can serve queries right now.
+        """
+        start = None
+        with self._lock:
+            if not self._ready.is_set():
+                if not self._loading:
+                    self._loading = True
+                    start = self._load
+            elif (
+                not self._refreshing
+                and time.monotonic() - self._last_refresh >= self._refresh_interval
+            ):
+                self._refreshing = True
+                start = self._refresh
+        if start is not None:
+            threading.Thread(target=start, daemon=True).start()
+        return self._ready.is_set()
+
+    # --- Querying ---
+    def iter_matches(self, required_tags, any_tags=None):
+        """
+        Yield documents (as dicts) carrying every tag in `required_tags` and,
+        when given, at least one tag in `any_tags`, newest first.
+        """
+        required = normalize_tags(required_tags)
+        optional = normalize_tags(any_tags) if any_tags else ()
+
+        with self._lock:
+            entries = self._entries
+            # Posting arrays only ever grow at the end (edits swap in a copy),
+            # so a (array, length) snapshot stays valid after the lock is released.
+            required_postings = []
+            for tag in required:
+                posting = self._postings.get(tag)
+                if posting is None:
+                    return
+                required_postings.append((posting, len(posting)))
+            optional_postings = [
+                (self._postings[tag], len(self._postings[tag]))
+                for tag in optional
+                if tag in self._postings
+            ]
+            total = len(entries)
+
+        if optional and not optional_postings:
+            return
+
+        def contains(posting_snapshot, doc_id) -> bool:
+            posting, length = posting_snapshot
+            pos = bisect.bisect_left(posting, doc_id, 0, length)
+            return pos < length and posting[pos] == doc_id
+
+        if required_postings:
+            required_postings.sort(key=lambda item: item[1])
+            driver, driver_length = required_postings[0]
+            others = required_postings[1:]
+            candidates = (driver[i] for i in range(driver_length - 1, -1, -1))
+        elif optional_postings:
+            others = []
+            candidates = heapq.merge(
+                *(
+                    (posting[i] for i in range(length - 1, -1, -1))
+                    for posting, length in optional_postings
+                ),
+                reverse=True,
+            )
+        else:
+            others = []
+            candidates = iter(range(total - 1, -1, -1))
+
+        previous = None
+        for doc_id in candidates:
+            if doc_id == previous:
+                continue
+            previous = doc_id
+            if not all(contains(other, doc_id) for other in others):
+                continue
+            if required_postings and optional_postings and not any(
+                contains(posting, doc_id) for posting in optional_postings
+            ):
+                continue
+            yield entries[doc_id].as_doc(self._default_url)
+
+    @property
+    def version(self) -> str | None:
+        """
+        Validator for the catalog as this process has it: image count, newest
+        `created_at` and newest `updated_at` (edits such as variant
+        backfills).  The same in every process once caught up; None until loaded.
+        """
+        with self._lock:
+            if not self._ready.is_set():
+                return None
+            created = self._last_created_at.isoformat() if self._last_created_at else ""
+            updated = self._tail_updated_at.isoformat() if self._tail_updated_at else ""
+            return f"{len(self._entries)}-{created}-{updated}"
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "ready": self._ready.is_set(),
+                "images": len(self._entries),
+                "tags": len(self._postings),
+                "postings": sum(len(posting) for posting in self._postings.values()),
+                "last_created_at": self._last_created_at.isoformat() if self._last_created_at else None,
+            }
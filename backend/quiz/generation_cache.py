@@ -0,0 +1,135 @@
+"""
+Prompt-keyed cache in front of Gemini image generation, stored in the
+`OutfitCache` table.
+
+A key is the normalized tag set plus weather bucket and variation index, so
+"variation 2 of casual/womenswear for hot weather" is generated once and then
+served from R2.  `refresh_rate` sends that fraction of hits to the model
+anyway, so popular prompts keep picking up new looks (the new image replaces
+the cached one).  Age and size limits are enforced by `prune_old_outfits`.
+"""
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .generation_queue import job_key
+from .models import OutfitCache, prune_old_outfits
+
+
+def cache_key(tags, weather=None, variation: int = 0) -> str:
+    return f"{job_key(tags, weather)}::v{variation}"
+
+
+class GenerationCache:
+    def __init__(
+        self,
+        refresh_rate: float = 0.1,
+        max_age_days: int = 30,
+        max_entries: int = 5000,
+        prune_interval: float = 600,
+    ):
+        self.refresh_rate = max(0.0, min(refresh_rate, 1.0))
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.prune_interval = prune_interval
+
+        self._lock = threading.Lock()
+        self._pruning = False
+        self._last_prune = 0.0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "stores": 0,
+            "evicted": 0,
+            "errors": 0,
+        }
+
+    def _count(self, **amounts) -> None:
+        with self._lock:
+            for name, amount in amounts.items():
+                self._counters[name] += amount
+
+    def lookup(self, keys) -> dict[str, OutfitCache]:
+        """
+        Cached entries to serve for `keys`.  Keys missing from the result
+        (not cached, expired, or picked for a refresh) need generating.
+        """
+        keys = list(keys)
+        cutoff = timezone.now() - timedelta(days=self.max_age_days)
+        try:
+            entries = {
+                entry.query: entry
+                for entry in OutfitCache.objects.filter(query__in=keys, created_at__gte=cutoff)
+            }
+        except DatabaseError as exc:
+            print(f"[DEBUG] Generation cache lookup failed: {exc}")
+            self._count(errors=1, misses=len(keys))
+            return {}
+
+        served = {}
+        refreshes = 0
+        for key in keys:
+            entry = entries.get(key)
+            if entry is None or not entry.image:
+                continue
+            if random.random() < self.refresh_rate:
+                refreshes += 1
+                continue
+            served[key] = entry
+        self._count(hits=len(served), refreshes=refreshes, misses=len(keys) - len(served) - refreshes)
+        return served
+
+    def store(self, key: str, image_url: str, filename: str, tags) -> None:
+        """Remember (or replace) the generated image for `key`."""
+        try:
+            OutfitCache.objects.update_or_create(
+                query=key,
+                defaults={
+                    "image": image_url,
+                    "filename": filename,
+                    "tags": list(tags or []),
+                    "created_at": timezone.now(),
+                },
+            )
+        except DatabaseError as exc:
+            print(f"[DEBUG] Generation cache store failed for {key}: {exc}")
+            self._count(errors=1)
+            return
+        self._count(stores=1)
+        self._maybe_prune()
+
+    def _maybe_prune(self) -> None:
+        with self._lock:
+            if self._pruning or time.monotonic() - self._last_prune < self.prune_interval:
+                return
+            self._pruning = True
+        threading.Thread(target=self._prune, name="generation-cache-prune", daemon=True).start()
+
+    def _prune(self) -> None:
+        try:
+            removed = prune_old_outfits(days=self.max_age_days, max_entries=self.max_entries)
+            if removed:
+                self._count(evicted=removed)
+                print(f"[DEBUG] Pruned {removed} generation cache entr{'y' if removed == 1 else 'ies'}")
+        except DatabaseError as exc:
+            print(f"[DEBUG] Generation cache prune failed: {exc}")
+            self._count(errors=1)
+        finally:
+            with self._lock:
+                self._pruning = False
+                self._last_prune = time.monotonic()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"] + stats["refreshes"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        stats["refresh_rate"] = self.refresh_rate
+        stats["max_entries"] = self.max_entries
+        stats["max_age_days"] = self.max_age_days
+        return stats
@@ -0,0 +1,92 @@
+"""
+In-process pub/sub for freshly generated outfits.
+
+Generation runs on scheduler worker threads while streaming `recommend`
+responses wait on the ASGI event loop.  Subscribers register an
+`asyncio.Queue` under a generation job key; publishers hand items to every
+subscriber's loop with `call_soon_threadsafe`, so worker threads never touch
+a queue directly.
+"""
+import asyncio
+import threading
+
+# Sent to subscribers when the job for their key has finished.
+DONE = object()
+
+
+class Subscription:
+    def __init__(self, hub: "GenerationEvents", key: str, loop: asyncio.AbstractEventLoop, max_items: int):
+        self._hub = hub
+        self.key = key
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_items)
+
+    def _deliver(self, item) -> None:
+        # Runs on the subscriber's loop.  A slow consumer loses outfits
+        # rather than growing without bound; DONE always gets through.
+        if item is DONE and self.queue.full():
+            self.queue.get_nowait()
+        if not self.queue.full():
+            self.queue.put_nowait(item)
+
+    async def get(self, timeout: float):
+        """Next published item, DONE, or None after `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
+
+
+class GenerationEvents:
+    def __init__(self, max_items: int = 20):
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._max_items = max_items
+        self._published = 0
+
+    def subscribe(self, key: str) -> Subscription:
+        """Subscribe the running event loop to outfits generated for `key`."""
+        subscription = Subscription(self, key, asyncio.get_running_loop(), self._max_items)
+        with self._lock:
+            self._subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.key)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.key]
+
+    def _send(self, key: str, item) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, item)
+            except RuntimeError:
+                # The subscriber's loop has been closed.
+                self.unsubscribe(subscription)
+
+    def publish(self, key: str, item) -> None:
+        """Hand a generated outfit to every subscriber of `key` (thread-safe)."""
+        with self._lock:
+            self._published += 1
+        self._send(key, item)
+
+    def finish(self, key: str) -> None:
+        """Tell subscribers of `key` that no more outfits are coming."""
+        self._send(key, DONE)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "keys": len(self._subscribers),
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "published": self._published,
+            }
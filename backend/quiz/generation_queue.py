@@ -0,0 +1,223 @@
+"""
+Background outfit generation scheduler.
+
+Jobs are persisted in Mongo before they are queued, so pending work survives
+a worker recycle, and a partial unique index on `key` (active jobs only)
+deduplicates identical tag sets + weather across processes.  Each process
+runs a fixed pool of worker threads fed by a bounded in-memory queue; when
+the queue is full new work is rejected instead of piling up.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+
+def job_key(tags, weather=None) -> str:
+    normalized = sorted({str(tag).strip().lower() for tag in tags or [] if str(tag).strip()})
+    return f"{'|'.join(normalized)}::{weather or 'any'}"
+
+
+class GenerationScheduler:
+    def __init__(
+        self,
+        run_job,
+        jobs_collection,
+        workers: int = 2,
+        max_queue: int = 50,
+        stale_after: float = 900,
+        recover_interval: float = 60,
+    ):
+        """
+        `run_job(job)` receives the persisted job document and performs the
+        generation.  Jobs left `running` for longer than `stale_after`
+        seconds belong to a dead worker and are picked up again; every
+        `recover_interval` seconds a sweep requeues those and any pending
+        jobs that no process has queued (e.g. left over when a queue was full).
+        """
+        self._run_job = run_job
+        self.jobs = jobs_collection
+        self.workers = workers
+        self.stale_after = stale_after
+        self.recover_interval = recover_interval
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._started = False
+        self._running = 0
+        self._queued: set = set()
+        self._counters = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "recovered": 0,
+        }
+        self._wait_times: deque = deque(maxlen=200)
+        self._run_times: deque = deque(maxlen=200)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def ensure_started(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for index in range(self.workers):
+            threading.Thread(target=self._work, name=f"generation-{index}", daemon=True).start()
+        threading.Thread(target=self._recover_loop, name="generation-recover", daemon=True).start()
+
+    def _enqueue(self, job_id) -> bool:
+        with self._lock:
+            self._queued.add(job_id)
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            with self._lock:
+                self._queued.discard(job_id)
+            return False
+        return True
+
+    def _recover_loop(self) -> None:
+        while True:
+            self._recover()
+            time.sleep(self.recover_interval)
+
+    def _recover(self) -> None:
+        """Requeue jobs that were pending, or running on a worker that died."""
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.stale_after)
+        # Newer pending jobs are still sitting in a live process's queue.
+        orphaned = now - timedelta(seconds=self.recover_interval)
+        try:
+            self.jobs.update_many(
+                {"status": "running", "started_at": {"$lt": cutoff}},
+                {"$set": {"status": "pending"}},
+            )
+            with self._lock:
+                queued = set(self._queued)
+            recovered = 0
+            for job in self.jobs.find(
+                {"status": "pending", "created_at": {"$lt": orphaned}}, {"_id": 1}
+            ).sort("created_at", 1):
+                if job["_id"] in queued:
+                    continue
+                if not self._enqueue(job["_id"]):
+                    break
+                recovered += 1
+            if recovered:
+                self._count("recovered", recovered)
+                print(f"[DEBUG] Requeued {recovered} pending generation job(s)")
+        except PyMongoError as exc:
+            print(f"[DEBUG] Generation job recovery failed: {exc}")
+
+    def submit(self, tags, weather=None, image_count: int = 2, user_id=None) -> str:
+        """Queue a generation job; returns "queued", "duplicate" or "rejected"."""
+        self.ensure_started()
+        if self._queue.full():
+            self._count("rejected")
+            return "rejected"
+
+        now = datetime.utcnow()
+        job = {
+            "key": job_key(tags, weather),
+            "tags": list(tags or []),
+            "weather": weather,
+            "image_count": image_count,
+            "user_id": user_id,
+            "status": "pending",
+            "active": True,
+            "created_at": now,
+        }
+        try:
+            job_id = self.jobs.insert_one(job).inserted_id
+        except DuplicateKeyError:
+            self._count("deduplicated")
+            return "duplicate"
+        except PyMongoError as exc:
+            print(f"[DEBUG] Could not persist generation job: {exc}")
+            self._count("rejected")
+            return "rejected"
+
+        if not self._enqueue(job_id):
+            self.jobs.delete_one({"_id": job_id})
+            self._count("rejected")
+            return "rejected"
+        self._count("submitted")
+        return "queued"
+
+    def _claim(self, job_id):
+        return self.jobs.find_one_and_update(
+            {"_id": job_id, "status": "pending"},
+            {"$set": {"status": "running", "started_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                self._queued.discard(job_id)
+            try:
+                job = self._claim(job_id)
+            except PyMongoError as exc:
+                print(f"[DEBUG] Could not claim generation job {job_id}: {exc}")
+                job = None
+            if job is None:
+                # Finished or claimed by another process in the meantime.
+                continue
+
+            started = time.monotonic()
+            with self._lock:
+                self._running += 1
+                self._wait_times.append((job["started_at"] - job["created_at"]).total_seconds())
+            status = "done"
+            try:
+                self._run_job(job)
+            except Exception as exc:
+                status = "failed"
+                print(f"[DEBUG] Generation job {job_id} failed: {exc}")
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._running -= 1
+                self._run_times.append(elapsed)
+                self._counters["completed" if status == "done" else "failed"] += 1
+            try:
+                self.jobs.update_one(
+                    {"_id": job_id},
+                    {
+                        "$set": {"status": status, "finished_at": datetime.utcnow(), "duration": elapsed},
+                        "$unset": {"active": ""},
+                    },
+                )
+            except PyMongoError as exc:
+                print(f"[DEBUG] Could not finish generation job {job_id}: {exc}")
+
+    def stats(self) -> dict[str, object]:
+        def summary(samples) -> dict[str, object]:
+            if not samples:
+                return {"count": 0, "avg": None, "max": None}
+            return {
+                "count": len(samples),
+                "avg": round(sum(samples) / len(samples), 3),
+                "max": round(max(samples), 3),
+            }
+
+        with self._lock:
+            stats = dict(self._counters)
+            stats["running"] = self._running
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["queue_capacity"] = self._queue.maxsize
+        stats["workers"] = self.workers
+        stats["wait_seconds"] = summary(wait_times)
+        stats["run_seconds"] = summary(run_times)
+        return stats
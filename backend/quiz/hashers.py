@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the work factor taken from
+    `settings.PASSWORD_HASH_ITERATIONS`.  The algorithm name is unchanged,
+    so existing hashes keep verifying; hashes made at a different cost are
+    upgraded on the next successful login.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return getattr(settings, "PASSWORD_HASH_ITERATIONS", PBKDF2PasswordHasher.iterations)
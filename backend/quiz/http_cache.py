@@ -0,0 +1,75 @@
+"""
+HTTP caching for the read APIs.
+
+`cache_policy` wraps a view with its Cache-Control/Vary policy and, given a
+`validator(request)`, an ETag built from the version counters the response
+depends on (catalog index, instant snapshot, weather entry, wardrobe
+version).  A GET whose If-None-Match already names that ETag is answered with
+304 before the view runs, so browsers and the CDN revalidate without any view
+work.
+"""
+import hashlib
+from functools import wraps
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+# Policies for responses that must never be reused.
+NO_STORE = "no-store"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(value: str, weak: bool = False) -> str:
+    """Opaque ETag for a validator string (hashed, so it leaks no ids)."""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+    etag = quote_etag(digest)
+    return f"W/{etag}" if weak else etag
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True if the request's If-None-Match already names `etag` (weak comparison)."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    opaque = etag.removeprefix("W/")
+    return "*" in tags or opaque in tags or f"W/{opaque}" in tags
+
+
+def cache_policy(cache_control, validator=None, vary=(), weak=False):
+    """
+    `cache_control` is a Cache-Control value or `fn(request) -> value`.
+    `validator(request)` returns the string the response is fully determined
+    by, or None when the request should not get an ETag.  Use `weak` for
+    responses that are equivalent but not byte-identical (random samples).
+    Errors are always sent with `no-store`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            policy = cache_control(request) if callable(cache_control) else cache_control
+            etag = None
+            if validator is not None and request.method in ("GET", "HEAD"):
+                value = validator(request)
+                if value is not None:
+                    etag = make_etag(value, weak)
+
+            if etag and etag_matches(request, etag):
+                response = HttpResponseNotModified()
+            else:
+                response = view(request, *args, **kwargs)
+
+            if response.status_code in (200, 304):
+                if etag and not response.has_header("ETag"):
+                    response["ETag"] = etag
+                response["Cache-Control"] = policy
+            else:
+                response["Cache-Control"] = NO_STORE
+            if vary:
+                patch_vary_headers(response, vary)
+            return response
+
+        return wrapped
+
+    return decorator
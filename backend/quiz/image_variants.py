@@ -0,0 +1,106 @@
+"""
+Resized / modern-format variants of catalog images.
+
+Each ingested image gets a WebP (and, when Pillow was built with AVIF
+support, an AVIF) rendition at every configured width smaller than the
+original.  Variant object keys are derived from the original filename, so
+the catalog only needs to remember which (width, format) pairs exist.
+"""
+import io
+import sys
+
+from PIL import Image, features
+
+CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+QUALITY = {"webp": 80, "avif": 60}
+
+
+def supported_formats() -> tuple[str, ...]:
+    formats = []
+    if features.check("webp"):
+        formats.append("webp")
+    if features.check("avif"):
+        formats.append("avif")
+    return tuple(formats)
+
+
+def variant_filename(filename: str, width: int, fmt: str) -> str:
+    stem = filename.rsplit(".", 1)[0]
+    return f"variants/{stem}__w{width}.{fmt}"
+
+
+def build_variants(image_bytes: bytes, widths, formats=None) -> list[dict]:
+    """Render every (width, format) variant smaller than the original."""
+    formats = supported_formats() if formats is None else formats
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        source.load()
+        if source.mode not in ("RGB", "RGBA"):
+            has_alpha = source.mode in ("LA", "PA") or "transparency" in source.info
+            source = source.convert("RGBA" if has_alpha else "RGB")
+        variants = []
+        for width in sorted(set(widths)):
+            if width >= source.width:
+                continue
+            height = max(1, round(source.height * width / source.width))
+            resized = source.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=QUALITY.get(fmt, 80))
+                variants.append({
+                    "width": width,
+                    "height": height,
+                    "format": fmt,
+                    "content_type": CONTENT_TYPES[fmt],
+                    "data": buffer.getbuffer(),
+                })
+    return variants
+
+
+_SPEC_CACHE: dict[tuple, tuple] = {}
+
+
+def variant_specs(variants) -> tuple[tuple[int, str], ...]:
+    """
+    Compact, shared representation of a document's variant list: most
+    images have the same (width, format) set, so one tuple is reused.
+    """
+    specs = tuple(sorted(
+        (int(variant["width"]), sys.intern(str(variant["format"])))
+        for variant in variants or []
+        if isinstance(variant, dict) and variant.get("width") and variant.get("format")
+    ))
+    return _SPEC_CACHE.setdefault(specs, specs)
+
+
+def accepted_formats(accept_header: str | None) -> set[str]:
+    """
+    Formats the client can display.  WebP is supported by every browser we
+    target; AVIF only when the client advertises it.
+    """
+    accepted = {"webp"}
+    if accept_header and "image/avif" in accept_header:
+        accepted.add("avif")
+    return accepted
+
+
+def pick_variant(images: dict | None, max_width: int | None, formats: set[str]) -> str | None:
+    """
+    Return the URL of the smallest variant at least `max_width` wide in an
+    accepted format, preferring AVIF over WebP at equal width.  Falls back to
+    the largest narrower variant, then to None (use the original).
+    """
+    if not isinstance(images, dict) or not max_width:
+        return None
+    candidates = [
+        variant for variant in images.get("variants") or []
+        if isinstance(variant, dict) and variant.get("format") in formats and variant.get("url")
+    ]
+    if not candidates:
+        return None
+    rank = {"avif": 0, "webp": 1}
+    wide_enough = [variant for variant in candidates if variant.get("width", 0) >= max_width]
+    if wide_enough:
+        best = min(wide_enough, key=lambda variant: (variant["width"], rank.get(variant["format"], 9)))
+    else:
+        best = max(candidates, key=lambda variant: (variant.get("width", 0), -rank.get(variant["format"], 9)))
+    return best["url"]
@@ -0,0 +1,221 @@
+"""
+Per-process snapshot of the `instantoutfit` collection.
+
+The collection is small and rarely written, so each worker keeps every
+outfit in memory, already reduced to the fields the response uses and
+grouped into pools by vibe term.  A background thread keeps it current from
+a change stream; on a standalone mongod (no change streams) it falls back
+to reloading the collection every `poll_interval` seconds.
+"""
+import random
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from pymongo.errors import ConnectionFailure
+
+
+class _Pool:
+    """Set of outfit ids with O(1) add/remove and uniform random sampling."""
+
+    __slots__ = ("ids", "positions")
+
+    def __init__(self):
+        self.ids: list = []
+        self.positions: dict = {}
+
+    def add(self, item_id) -> None:
+        if item_id not in self.positions:
+            self.positions[item_id] = len(self.ids)
+            self.ids.append(item_id)
+
+    def remove(self, item_id) -> None:
+        position = self.positions.pop(item_id, None)
+        if position is None:
+            return
+        last = self.ids.pop()
+        if position < len(self.ids):
+            self.ids[position] = last
+            self.positions[last] = position
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _digest(item_id, item: dict, terms: tuple) -> int:
+    return zlib.crc32(repr((str(item_id), sorted(item.items()), terms)).encode("utf-8"))
+
+
+class InstantSnapshot:
+    def __init__(self, collection, projection: dict, make_item, vibe_terms, poll_interval: float = 60.0):
+        """
+        `make_item(doc)` turns a raw document into the response item (or
+        None to skip it) and `vibe_terms(doc)` lists the terms it can be
+        requested by.
+        """
+        self._collection = collection
+        self._projection = projection
+        self._make_item = make_item
+        self._vibe_terms = vibe_terms
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._items: dict = {}
+        self._terms_by_id: dict = {}
+        self._all = _Pool()
+        self._pools: dict[str, _Pool] = {}
+        # XOR of per-outfit digests: identical in every process holding the
+        # same outfits, however they were loaded.
+        self._fingerprint = 0
+        self._ready = threading.Event()
+        self._started = False
+        self._mode = None
+        self._reloads = 0
+        self._changes = 0
+        self._last_reload = None
+
+    # --- Maintenance ---
+    def ensure_started(self) -> bool:
+        """Start the background loader once and report whether the snapshot is loaded."""
+        with self._lock:
+            if not self._started:
+                self._started = True
+                threading.Thread(target=self._run, name="instant-snapshot", daemon=True).start()
+        return self._ready.is_set()
+
+    def _reload(self) -> None:
+        items, terms_by_id, all_pool, pools = {}, {}, _Pool(), {}
+        fingerprint = 0
+        for doc in self._collection.find({}, self._projection):
+            item = self._make_item(doc)
+            if item is None:
+                continue
+            terms = tuple(self._vibe_terms(doc))
+            items[doc["_id"]] = item
+            terms_by_id[doc["_id"]] = terms
+            fingerprint ^= _digest(doc["_id"], item, terms)
+            all_pool.add(doc["_id"])
+            for term in terms:
+                pools.setdefault(term, _Pool()).add(doc["_id"])
+        with self._lock:
+            self._items, self._terms_by_id, self._all, self._pools = items, terms_by_id, all_pool, pools
+            self._fingerprint = fingerprint
+            self._reloads += 1
+            self._last_reload = datetime.utcnow()
+        self._ready.set()
+
+    def _remove(self, item_id) -> None:
+        item = self._items.pop(item_id, None)
+        if item is None:
+            return
+        self._fingerprint ^= _digest(item_id, item, self._terms_by_id.get(item_id, ()))
+        self._all.remove(item_id)
+        for term in self._terms_by_id.pop(item_id, ()):
+            pool = self._pools.get(term)
+            if pool is not None:
+                pool.remove(item_id)
+                if not pool:
+                    del self._pools[term]
+
+    def _apply(self, change: dict) -> bool:
+        """Apply one change event; False means the stream needs a full reload."""
+        operation = change.get("operationType")
+        if operation in ("drop", "rename", "dropDatabase", "invalidate"):
+            return False
+        item_id = (change.get("documentKey") or {}).get("_id")
+        doc = change.get("fullDocument")
+        item = self._make_item(doc) if doc else None
+        terms = tuple(self._vibe_terms(doc)) if doc else ()
+        with self._lock:
+            self._remove(item_id)
+            if item is not None:
+                self._items[item_id] = item
+                self._terms_by_id[item_id] = terms
+                self._fingerprint ^= _digest(item_id, item, terms)
+                self._all.add(item_id)
+                for term in terms:
+                    self._pools.setdefault(term, _Pool()).add(item_id)
+            self._changes += 1
+        return True
+
+    def _watch(self) -> None:
+        # Open the stream before loading so nothing written in between is lost.
+        with self._collection.watch(full_document="updateLookup") as stream:
+            self._mode = "change_stream"
+            self._reload()
+            for change in stream:
+                if not self._apply(change):
+                    return
+
+    def _run(self) -> None:
+        watch = True
+        while True:
+            try:
+                if watch:
+                    self._watch()
+                    continue
+                self._reload()
+            except Exception as exc:
+                if watch and not isinstance(exc, ConnectionFailure):
+                    # Standalone mongod: change streams need a replica set.
+                    print(f"[DEBUG] Instant snapshot falling back to polling: {exc}")
+                    watch = False
+                    self._mode = "poll"
+                    continue
+                print(f"[DEBUG] Instant snapshot refresh failed: {exc}")
+            time.sleep(self.poll_interval)
+
+    # --- Querying ---
+    def sample(self, term: str | None, size: int, exclude_names=(), is_seen=None) -> list[dict]:
+        """
+        Up to `size` random items for `term` (any when empty), skipping
+        excluded names and names for which `is_seen(name)` is true.  Only
+        when the first draw is mostly seen is the rest of the pool shuffled.
+        """
+        def keep(item) -> bool:
+            name = item["name"]
+            return name not in exclude_names and not (is_seen and is_seen(name))
+
+        with self._lock:
+            pool = self._pools.get(term) if term else self._all
+            if pool is None:
+                return []
+            # At most len(exclude_names) picks can be dropped below, plus
+            # however many `is_seen` drops; over-draw for those.
+            extra = max(size * 3, 24) if is_seen else 0
+            draw = min(len(pool), size + len(exclude_names) + extra)
+            drawn = random.sample(pool.ids, draw)
+            items = [self._items[item_id] for item_id in drawn]
+        picked = [item for item in items if keep(item)]
+        if len(picked) < size and draw < len(pool):
+            with self._lock:
+                drawn = set(drawn)
+                rest = [self._items[item_id] for item_id in pool.ids if item_id not in drawn]
+            random.shuffle(rest)
+            for item in rest:
+                if len(picked) >= size:
+                    break
+                if keep(item):
+                    picked.append(item)
+        return picked[:size]
+
+    @property
+    def version(self) -> str | None:
+        """Validator for the loaded outfits (None until loaded)."""
+        with self._lock:
+            if not self._ready.is_set():
+                return None
+            return f"{len(self._items)}-{self._fingerprint:08x}"
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "ready": self._ready.is_set(),
+                "mode": self._mode,
+                "outfits": len(self._items),
+                "terms": len(self._pools),
+                "reloads": self._reloads,
+                "changes": self._changes,
+                "last_reload": self._last_reload.isoformat() if self._last_reload else None,
+            }
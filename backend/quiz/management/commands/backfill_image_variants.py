@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from botocore.exceptions import BotoCoreError, ClientError
+from django.core.management.base import BaseCommand
+
+from quiz import views
+from quiz.image_variants import build_variants, variant_filename
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate resized WebP/AVIF variants for catalog images that do not "
+        "have them yet, upload them to R2 and record them in `images`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Images processed in parallel.")
+        parser.add_argument("--limit", type=int, default=0, help="Stop after this many images (0 = all).")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the images that need variants.")
+
+    def _process(self, doc: dict) -> str:
+        filename = doc["filename"]
+        try:
+            body = views.s3.get_object(Bucket=views.BUCKET, Key=filename)["Body"].read()
+        except (BotoCoreError, ClientError) as exc:
+            return f"skipped {filename}: {exc}"
+
+        uploaded = []
+        for variant in build_variants(body, views.IMAGE_VARIANT_WIDTHS):
+            url = views.r2_uploader.upload(
+                variant_filename(filename, variant["width"], variant["format"]),
+                variant["data"],
+                variant["content_type"],
+            )
+            if url:
+                uploaded.append({
+                    "url": url,
+                    "width": variant["width"],
+                    "height": variant["height"],
+                    "format": variant["format"],
+                })
+        if not uploaded:
+            return f"skipped {filename}: no variants"
+
+        full_url = views.resolve_catalog_image_url(doc)
+        images = views.images_field(full_url, uploaded)
+        # `updated_at` lets running catalog indexes pick the variants up on
+        # their next refresh.
+        views.collection.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {
+                "images.thumbnail": images["thumbnail"],
+                "images.variants": uploaded,
+                "updated_at": datetime.utcnow(),
+            }},
+        )
+        return f"ok {filename} ({len(uploaded)} variants)"
+
+    def handle(self, *args, **options):
+        query = {"filename": {"$exists": True}, "images.variants": {"$exists": False}}
+        if options["dry_run"]:
+            count = views.collection.count_documents(query)
+            self.stdout.write(f"{count} image(s) need variants.")
+            return
+
+        cursor = views.collection.find(query, {"filename": 1, "images": 1, "image": 1})
+        if options["limit"]:
+            cursor = cursor.limit(options["limit"])
+
+        processed = failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            pending = set()
+            for doc in cursor:
+                pending.add(executor.submit(self._process, doc))
+                # Keep the number of in-memory images bounded.
+                if len(pending) >= options["workers"] * 2:
+                    done = next(as_completed(pending))
+                    pending.discard(done)
+                    processed, failed = self._report(done, processed, failed)
+            for done in as_completed(pending):
+                processed, failed = self._report(done, processed, failed)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} image(s), {failed} skipped or failed."))
+
+    def _report(self, future, processed: int, failed: int) -> tuple[int, int]:
+        try:
+            message = future.result()
+        except Exception as exc:
+            message = f"failed: {exc}"
+        if message.startswith("ok "):
+            processed += 1
+            self.stdout.write(message)
+        else:
+            failed += 1
+            self.stderr.write(message)
+        return processed, failed
@@ -0,0 +1,71 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.hashers import TunablePBKDF2PasswordHasher
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password verification throughput (logins per second) at "
+        "several PBKDF2 iteration counts, per core and across a worker pool, "
+        "to pick PASSWORD_HASH_ITERATIONS and PASSWORD_HASH_WORKERS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            default=None,
+            help="Comma-separated iteration counts (default: a range around the current setting).",
+        )
+        parser.add_argument("--seconds", type=float, default=2.0, help="Measuring time per setting.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Threads for the pooled measurement (default: CPU count).",
+        )
+
+    def _verifies(self, hasher, encoded: str, seconds: float) -> tuple[int, float]:
+        count = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while time.perf_counter() < deadline:
+            hasher.verify("benchmark-Password!", encoded)
+            count += 1
+        return count, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        current = settings.PASSWORD_HASH_ITERATIONS
+        if options["iterations"]:
+            try:
+                costs = [int(value) for value in options["iterations"].split(",") if value.strip()]
+            except ValueError:
+                raise CommandError("--iterations must be a comma-separated list of integers.")
+        else:
+            costs = sorted({current // 4, current // 2, current, current * 2} - {0})
+        workers = max(1, options["workers"])
+        seconds = options["seconds"]
+        hasher = TunablePBKDF2PasswordHasher()
+
+        self.stdout.write(f"Current PASSWORD_HASH_ITERATIONS={current}, pooled run uses {workers} thread(s).")
+        self.stdout.write(f"{'iterations':>12} {'ms/login':>10} {'logins/s/core':>14} {'logins/s pooled':>16}")
+        for cost in costs:
+            encoded = hasher.encode("benchmark-Password!", hasher.salt(), iterations=cost)
+
+            count, elapsed = self._verifies(hasher, encoded, seconds)
+            per_core = count / elapsed
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda _: self._verifies(hasher, encoded, seconds), range(workers)
+                ))
+            pooled = sum(count for count, _ in results) / max(elapsed for _, elapsed in results)
+
+            marker = "  <- current" if cost == current else ""
+            self.stdout.write(
+                f"{cost:>12} {1000 / per_core:>10.1f} {per_core:>14.1f} {pooled:>16.1f}{marker}"
+            )
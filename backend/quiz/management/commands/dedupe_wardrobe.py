@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from pymongo.errors import OperationFailure
+
+from quiz import views
+
+
+class Command(BaseCommand):
+    help = (
+        "Collapse duplicate wardrobe documents for the same (user_id, filename) "
+        "so the unique index can be built. Keeps the newest live copy. Run "
+        "before ensure_mongo_indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only count the duplicates that would be removed.")
+
+    def handle(self, *args, **options):
+        collection = views.wardrobe_collection
+        groups = collection.aggregate([
+            {"$sort": {"saved_at": -1, "_id": -1}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "filename": "$filename"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1},
+            }},
+            {"$match": {"count": {"$gt": 1}}},
+        ], allowDiskUse=True)
+
+        duplicates = []
+        for group in groups:
+            ids = group["ids"]  # newest first
+            live = collection.find_one(
+                {"_id": {"$in": ids}, "deleted": {"$ne": True}},
+                {"_id": 1},
+                sort=[("saved_at", -1), ("_id", -1)],
+            )
+            keep = live["_id"] if live else ids[0]
+            duplicates.extend(object_id for object_id in ids if object_id != keep)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(duplicates)} duplicate wardrobe document(s) would be removed.")
+            return
+
+        removed = 0
+        for start in range(0, len(duplicates), 1000):
+            chunk = duplicates[start:start + 1000]
+            removed += collection.delete_many({"_id": {"$in": chunk}}).deleted_count
+
+        # The old non-unique index has the same keys, so it must go before
+        # ensure_mongo_indexes can create the unique one.
+        for name, info in collection.index_information().items():
+            if info.get("key") == [("user_id", 1), ("filename", 1)] and not info.get("unique"):
+                try:
+                    collection.drop_index(name)
+                except OperationFailure as exc:
+                    self.stderr.write(self.style.ERROR(f"Could not drop index {name}: {exc}"))
+                else:
+                    self.stdout.write(f"Dropped non-unique index {name}.")
+
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} duplicate wardrobe document(s)."))
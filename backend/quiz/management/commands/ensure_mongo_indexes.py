@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz import views  # noqa: F401  (registers the index declarations)
+from quiz.mongo_indexes import ensure_indexes, explain_query_shapes
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the Mongo indexes declared by the quiz app and explain every "
+        "declared query shape, reporting any that fall back to a COLLSCAN."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-create",
+            action="store_true",
+            help="Only explain the query shapes; do not create indexes.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with an error if any query shape uses a COLLSCAN (for CI).",
+        )
+
+    def handle(self, *args, **options):
+        failures = 0
+
+        if not options["skip_create"]:
+            for result in ensure_indexes():
+                keys = ", ".join(f"{field}:{direction}" for field, direction in result["keys"])
+                if "error" in result:
+                    failures += 1
+                    self.stderr.write(self.style.ERROR(
+                        f"{result['collection']} [{keys}] failed: {result['error']}"
+                    ))
+                else:
+                    self.stdout.write(f"{result['collection']} [{keys}] -> {result['name']}")
+
+        collscans = []
+        for result in explain_query_shapes():
+            label = f"{result['collection']} '{result['query']}'"
+            if "error" in result:
+                failures += 1
+                self.stderr.write(self.style.ERROR(f"{label}: explain failed: {result['error']}"))
+            elif result["collscan"]:
+                collscans.append(label)
+                self.stderr.write(self.style.WARNING(
+                    f"{label}: COLLSCAN ({' > '.join(result['stages'])})"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{label}: {' > '.join(result['stages'])}"))
+
+        if options["check"] and (collscans or failures):
+            raise CommandError(
+                f"{len(collscans)} query shape(s) without an index, {failures} error(s)."
+            )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from quiz import views
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the normalized `vibe_terms` that `instant_outfits` samples by "
+        "on `instantoutfit` documents. Re-run after seeding new outfits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute documents that already have vibe_terms.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Updates sent per bulk write.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the documents that would be updated.")
+
+    def handle(self, *args, **options):
+        query = {} if options["all"] else {"vibe_terms": {"$exists": False}}
+        if options["dry_run"]:
+            count = views.instant_collection.count_documents(query)
+            self.stdout.write(f"{count} instant outfit(s) need vibe_terms.")
+            return
+
+        cursor = views.instant_collection.find(query, {"vibe": 1, "tags": 1, "seed_source": 1})
+        updated = 0
+        batch = []
+        for doc in cursor:
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"vibe_terms": views.instant_vibe_terms(doc)}}))
+            if len(batch) >= options["batch_size"]:
+                updated += views.instant_collection.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += views.instant_collection.bulk_write(batch, ordered=False).modified_count
+
+        self.stdout.write(self.style.SUCCESS(f"Updated vibe_terms on {updated} instant outfit(s)."))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_item'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outfitcache',
+            name='filename',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='outfitcache',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -6,15 +6,28 @@ from django.contrib.auth.models import User
 class OutfitCache(models.Model):
     query = models.CharField(max_length=255, unique=True)
     image = models.CharField(max_length=500)
+    filename = models.CharField(max_length=255, blank=True, default="")
     tags = models.JSONField(default=list)  # <- JSONField handles lists properly
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
 from django.utils import timezone
 from datetime import timedelta
 
-def prune_old_outfits(days=30):
+def prune_old_outfits(days=30, max_entries=None):
+    """
+    Delete cache entries older than `days`, then the oldest entries beyond
+    `max_entries`.  Returns the number of rows removed.
+    """
     cutoff = timezone.now() - timedelta(days=days)
-    OutfitCache.objects.filter(created_at__lt=cutoff).delete()
+    removed, _ = OutfitCache.objects.filter(created_at__lt=cutoff).delete()
+    if max_entries is not None:
+        boundary = list(
+            OutfitCache.objects.order_by("-created_at")
+            .values_list("created_at", flat=True)[max_entries:max_entries + 1]
+        )
+        if boundary:
+            removed += OutfitCache.objects.filter(created_at__lte=boundary[0]).delete()[0]
+    return removed
 
 class Item(models.Model):
     name = models.CharField(max_length=255)
@@ -0,0 +1,76 @@
+"""
+Registry of the Mongo indexes the quiz app relies on and the query shapes
+they exist to serve.  Declarations live next to the code issuing the queries
+(see `quiz.views`); `manage.py ensure_mongo_indexes` creates the indexes and
+explains every declared query shape.
+"""
+from pymongo.errors import PyMongoError
+
+_INDEXES: list[tuple[object, list[tuple[str, int]], dict]] = []
+_QUERY_SHAPES: list[tuple[object, str, dict, list[tuple[str, int]] | None]] = []
+
+
+def declare_index(collection, keys: list[tuple[str, int]], **options) -> None:
+    _INDEXES.append((collection, keys, options))
+
+
+def declare_query(collection, name: str, query: dict, sort: list[tuple[str, int]] | None = None) -> None:
+    """Register a representative filter/sort that must be index-backed."""
+    _QUERY_SHAPES.append((collection, name, query, sort))
+
+
+def _namespace(collection) -> str:
+    return f"{collection.database.name}.{collection.name}"
+
+
+def ensure_indexes(collection_for=None) -> list[dict[str, object]]:
+    """
+    Create every declared index; existing identical indexes are a no-op.
+    `collection_for(collection)` redirects each declared collection (tests
+    point them at a throwaway database).
+    """
+    results = []
+    for collection, keys, options in _INDEXES:
+        if collection_for is not None:
+            collection = collection_for(collection)
+        result = {"collection": _namespace(collection), "keys": keys, "options": options}
+        try:
+            result["name"] = collection.create_index(keys, **options)
+        except PyMongoError as exc:
+            result["error"] = str(exc)
+        results.append(result)
+    return results
+
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        stage = plan.get("stage")
+        if stage:
+            yield stage
+        for key in ("inputStage", "queryPlan"):
+            yield from _plan_stages(plan.get(key))
+        for child in plan.get("inputStages") or []:
+            yield from _plan_stages(child)
+
+
+def explain_query_shapes(collection_for=None) -> list[dict[str, object]]:
+    """Explain every declared query shape and flag collection scans."""
+    results = []
+    for collection, name, query, sort in _QUERY_SHAPES:
+        if collection_for is not None:
+            collection = collection_for(collection)
+        result = {"collection": _namespace(collection), "query": name}
+        try:
+            cursor = collection.find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = cursor.limit(1).explain().get("queryPlanner", {}).get("winningPlan", {})
+        except PyMongoError as exc:
+            result["error"] = str(exc)
+            results.append(result)
+            continue
+        stages = list(_plan_stages(plan))
+        result["stages"] = stages
+        result["collscan"] = "COLLSCAN" in stages
+        results.append(result)
+    return results
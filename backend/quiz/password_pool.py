@@ -0,0 +1,114 @@
+"""
+Bounded worker pool for password hashing.
+
+PBKDF2 is pure CPU, so an unbounded number of concurrent signups/logins can
+starve every other endpoint.  Hashes run on a fixed number of threads
+(`hashlib.pbkdf2_hmac` releases the GIL, so they use separate cores) behind
+a bounded queue; when the queue is full, or is already deeper than the
+workers can hash within `timeout` at the recently measured hash time,
+callers get `HashPoolBusy` and the view answers 503 instead of piling up
+more work.  A caller that still waits longer than `timeout` gets
+`HashPoolBusy` too.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class HashPoolBusy(Exception):
+    """Raised when the hashing queue is full or a hash did not finish in time."""
+
+
+class PasswordHashPool:
+    def __init__(self, workers: int = 2, max_queue: int = 64, timeout: float = 30.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._counters = {"submitted": 0, "rejected": 0, "completed": 0, "timed_out": 0}
+        self._wait_times: deque = deque(maxlen=200)
+        self._run_times: deque = deque(maxlen=200)
+
+    def _run(self, submitted_at: float, fn, args):
+        started = time.monotonic()
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+            self._wait_times.append(started - submitted_at)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._counters["completed"] += 1
+                self._run_times.append(time.monotonic() - started)
+            self._slots.release()
+
+    def _would_time_out(self) -> bool:
+        """True when the jobs already queued cannot finish within `timeout`."""
+        with self._lock:
+            if not self._run_times:
+                return False
+            hash_seconds = sum(self._run_times) / len(self._run_times)
+            rounds = (self._pending + self._running) // self.workers + 1
+        return rounds * hash_seconds > self.timeout
+
+    def run(self, fn, *args):
+        """Run `fn(*args)` on the pool and wait for the result."""
+        if self._would_time_out() or not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise HashPoolBusy()
+        with self._lock:
+            self._pending += 1
+            self._counters["submitted"] += 1
+        future = self._executor.submit(self._run, time.monotonic(), fn, args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            if future.cancel():
+                # Never started, so `_run` will not free its slot.
+                with self._lock:
+                    self._pending -= 1
+                self._slots.release()
+            with self._lock:
+                self._counters["timed_out"] += 1
+            raise HashPoolBusy() from None
+
+    def make_password(self, password: str) -> str:
+        return self.run(make_password, password)
+
+    def check_password(self, password: str, encoded: str, setter=None) -> bool:
+        """`setter(password)` is called (on the pool) when the stored hash needs upgrading."""
+        return self.run(check_password, password, encoded, setter)
+
+    def stats(self) -> dict[str, object]:
+        def summary(samples) -> dict[str, object]:
+            if not samples:
+                return {"count": 0, "avg": None, "max": None}
+            return {
+                "count": len(samples),
+                "avg": round(sum(samples) / len(samples), 3),
+                "max": round(max(samples), 3),
+            }
+
+        with self._lock:
+            stats = dict(self._counters)
+            stats["queue_depth"] = self._pending
+            stats["running"] = self._running
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+        stats["queue_capacity"] = self.max_queue
+        stats["workers"] = self.workers
+        stats["wait_seconds"] = summary(wait_times)
+        stats["hash_seconds"] = summary(run_times)
+        return stats
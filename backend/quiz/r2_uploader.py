@@ -0,0 +1,175 @@
+"""
+Asynchronous uploads to Cloudflare R2.
+
+A fixed pool of worker threads shares one boto3 client (and so one HTTP
+connection pool).  Image bytes are handed over as a `memoryview` and read in
+place, large objects go through multipart transfers, and failed uploads are
+retried with exponential backoff.  Callers get a `Future` resolving to the
+public URL (or None on failure) and can attach a callback instead of
+waiting.
+"""
+import io
+import mimetypes
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
+
+MB = 1024 * 1024
+
+
+class MemoryViewReader(io.RawIOBase):
+    """Seekable, read-only file object over a buffer, without copying it."""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        size = len(chunk)
+        buffer[:size] = chunk
+        self._pos += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        else:
+            position = len(self._view) + offset
+        self._pos = max(0, min(position, len(self._view)))
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class R2Uploader:
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        public_url,
+        workers: int = 8,
+        max_attempts: int = 4,
+        backoff: float = 0.5,
+        multipart_threshold: int = 8 * MB,
+        multipart_chunksize: int = 8 * MB,
+        part_concurrency: int = 4,
+    ):
+        """`public_url(filename)` returns the URL an uploaded object is served from."""
+        self._client = client
+        self.bucket = bucket
+        self._public_url = public_url
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=part_concurrency,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="r2-upload")
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {
+            "submitted": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "bytes": 0,
+        }
+        self._recent: deque = deque(maxlen=200)  # (finished_at, bytes, seconds)
+
+    def _put(self, filename: str, data, content_type: str | None) -> None:
+        extra_args = {"ContentType": content_type} if content_type else None
+        self._client.upload_fileobj(
+            MemoryViewReader(data),
+            self.bucket,
+            filename,
+            ExtraArgs=extra_args,
+            Config=self._transfer_config,
+        )
+
+    def _upload(self, filename: str, data, content_type: str | None) -> str | None:
+        started = time.monotonic()
+        size = memoryview(data).nbytes
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    self._put(filename, data, content_type)
+                    break
+                except (BotoCoreError, ClientError) as exc:
+                    if attempt == self.max_attempts:
+                        print(f"Upload failed for {filename}: {exc}")
+                        with self._lock:
+                            self._counters["failed"] += 1
+                        return None
+                    with self._lock:
+                        self._counters["retries"] += 1
+                    delay = self.backoff * (2 ** (attempt - 1))
+                    time.sleep(delay + random.uniform(0, delay / 2))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._counters["succeeded"] += 1
+            self._counters["bytes"] += size
+            self._recent.append((time.monotonic(), size, elapsed))
+        return self._public_url(filename)
+
+    def submit(self, filename: str, data, content_type: str | None = None, callback=None) -> Future:
+        """
+        Queue an upload and return a Future resolving to the public URL, or
+        None if every attempt failed.  `callback(url)` runs on the upload
+        thread once it finishes.
+        """
+        if content_type is None:
+            content_type = mimetypes.guess_type(filename)[0]
+        with self._lock:
+            self._counters["submitted"] += 1
+            self._in_flight += 1
+        future = self._executor.submit(self._upload, filename, data, content_type)
+        if callback is not None:
+            def run_callback(finished: Future) -> None:
+                try:
+                    callback(finished.result())
+                except Exception as exc:
+                    print(f"[DEBUG] Upload callback for {filename} failed: {exc}")
+            future.add_done_callback(run_callback)
+        return future
+
+    def upload(self, filename: str, data, content_type: str | None = None) -> str | None:
+        """Blocking upload, for callers that need the URL before continuing."""
+        if not data:
+            return None
+        return self.submit(filename, data, content_type).result()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = self._in_flight
+            recent = list(self._recent)
+        window = [sample for sample in recent if time.monotonic() - sample[0] <= 60]
+        stats["last_minute"] = {
+            "uploads": len(window),
+            "bytes_per_second": round(sum(sample[1] for sample in window) / 60, 1),
+            "avg_seconds": round(sum(sample[2] for sample in window) / len(window), 3) if window else None,
+        }
+        stats["workers"] = self.workers
+        return stats
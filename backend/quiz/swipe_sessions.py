@@ -0,0 +1,111 @@
+"""
+Server-side swipe sessions.
+
+Instead of resending every filename it has already shown, a client holds an
+opaque session token.  The server keeps a fixed-size Bloom filter of the
+names served in that session, stored in Mongo with a TTL, so requests and
+filtering stay constant-size however long the session runs.
+"""
+import hashlib
+import math
+import secrets
+from datetime import datetime, timedelta
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float, bits: bytes | None = None, hashes: int | None = None):
+        size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.size = (size + 7) // 8 * 8
+        self.hashes = hashes or max(1, round(self.size / capacity * math.log(2)))
+        if bits is not None and len(bits) * 8 == self.size:
+            self.bits = bytearray(bits)
+        else:
+            self.bits = bytearray(self.size // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class SwipeSession:
+    __slots__ = ("token", "seen", "count", "is_new")
+
+    def __init__(self, token: str, seen: BloomFilter, count: int = 0, is_new: bool = False):
+        self.token = token
+        self.seen = seen
+        self.count = count
+        self.is_new = is_new
+
+    def __contains__(self, name: str) -> bool:
+        return bool(name) and name in self.seen
+
+    def add(self, name: str) -> None:
+        if name:
+            self.seen.add(name)
+            self.count += 1
+
+
+class SwipeSessionStore:
+    def __init__(self, collection, ttl_seconds: int = 6 * 3600, capacity: int = 2000, error_rate: float = 0.01):
+        self.collection = collection
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+    def _new_filter(self, bits: bytes | None = None) -> BloomFilter:
+        return BloomFilter(self.capacity, self.error_rate, bits=bits)
+
+    def create(self) -> SwipeSession:
+        return SwipeSession(secrets.token_urlsafe(16), self._new_filter(), is_new=True)
+
+    def open(self, token) -> SwipeSession | None:
+        """
+        Load the session for `token`.  Returns None when no token was sent
+        and a fresh session when the token is unknown or expired.
+        """
+        if not isinstance(token, str) or not token.strip():
+            return None
+        try:
+            doc = self.collection.find_one(
+                {"_id": token.strip(), "expires_at": {"$gt": datetime.utcnow()}}
+            )
+        except Exception as exc:
+            print(f"[DEBUG] Swipe session lookup failed: {exc}")
+            doc = None
+        if not doc:
+            return self.create()
+        count = int(doc.get("count") or 0)
+        if count >= self.capacity:
+            # Past capacity the false-positive rate climbs quickly, so start
+            # over rather than hiding most of the catalog.
+            return SwipeSession(doc["_id"], self._new_filter())
+        return SwipeSession(doc["_id"], self._new_filter(doc.get("seen")), count=count)
+
+    def save(self, session: SwipeSession) -> None:
+        now = datetime.utcnow()
+        try:
+            self.collection.update_one(
+                {"_id": session.token},
+                {"$set": {
+                    "seen": bytes(session.seen.bits),
+                    "count": session.count,
+                    "updated_at": now,
+                    "expires_at": now + self.ttl,
+                }},
+                upsert=True,
+            )
+        except Exception as exc:
+            print(f"[DEBUG] Swipe session save failed: {exc}")
@@ -0,0 +1,52 @@
+from unittest import SkipTest
+
+from django.test import SimpleTestCase
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from quiz import views
+from quiz.mongo_indexes import ensure_indexes, explain_query_shapes
+
+
+class QueryShapeTests(SimpleTestCase):
+    """
+    Every declared query shape must be index-backed.  Needs a reachable
+    mongod; the indexes are built in throwaway `test_*` databases, never in
+    the ones the app uses.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.client = MongoClient(views.MONGO_URI, serverSelectionTimeoutMS=2000)
+        try:
+            cls.client.admin.command("ping")
+        except PyMongoError as exc:
+            cls.client.close()
+            raise SkipTest(f"MongoDB is not reachable: {exc}")
+        cls.databases = set()
+
+    @classmethod
+    def tearDownClass(cls):
+        for name in cls.databases:
+            cls.client.drop_database(name)
+        cls.client.close()
+        super().tearDownClass()
+
+    @classmethod
+    def collection_for(cls, collection):
+        name = f"test_{collection.database.name}"
+        cls.databases.add(name)
+        return cls.client[name][collection.name]
+
+    def test_no_collection_scans(self):
+        # Same order as the deploy build: create the indexes, then explain.
+        failures = [result for result in ensure_indexes(self.collection_for) if "error" in result]
+        self.assertEqual(failures, [])
+
+        results = explain_query_shapes(self.collection_for)
+        self.assertTrue(results)
+        for result in results:
+            with self.subTest(collection=result["collection"], query=result["query"]):
+                self.assertNotIn("error", result)
+                self.assertFalse(result["collscan"], " > ".join(result["stages"]))
@@ -1,22 +1,25 @@
-import os, json, random, string, io, base64, re, requests, time, jwt
+import os, json, random, asyncio, string, base64, re, requests, csv, tempfile
 from urllib.parse import quote
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, StreamingHttpResponse, FileResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
-from django.contrib.auth.hashers import make_password, check_password
+from django.contrib.auth.hashers import make_password
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.settings import api_settings as jwt_api_settings
 from datetime import datetime, timedelta
-from django.conf import settings
+from asgiref.sync import sync_to_async
 from google import genai
-import threading
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 import boto3
 from bson import ObjectId
+from bson.errors import InvalidId
 from openpyxl import Workbook
 try:
     from .detectron2_helpers import segment_clothing, visualise_masks
@@ -26,7 +29,21 @@ except ModuleNotFoundError as exc:
     visualise_masks = None
     _SEGMENTATION_AVAILABLE = False
     _SEGMENTATION_IMPORT_ERROR = exc
-from botocore.exceptions import BotoCoreError, ClientError
+from botocore.config import Config as BotoConfig
+from .catalog_index import CatalogIndex
+from .swipe_sessions import SwipeSessionStore
+from .mongo_indexes import declare_index, declare_query
+from .weather_cache import WeatherCache, WeatherPrefetcher
+from .generation_queue import GenerationScheduler, job_key
+from .generation_events import DONE, GenerationEvents
+from .generation_cache import GenerationCache, cache_key
+from .instant_snapshot import InstantSnapshot
+from .auth import TTLCache, request_auth
+from .password_pool import HashPoolBusy, PasswordHashPool
+from .cached_count import CachedCount
+from .http_cache import NO_STORE, PRIVATE_REVALIDATE, cache_policy
+from .r2_uploader import R2Uploader
+from .image_variants import accepted_formats, build_variants, pick_variant, variant_filename
 
 load_dotenv()
 
@@ -46,13 +63,24 @@ instant_collection = images_db["instantoutfit"]
 users_db = client["users_db"]
 users_collection = users_db["users"]
 wardrobe_collection = users_db["wardrobe"]
+wardrobe_versions_collection = users_db["wardrobe_versions"]
 early_access_collection = users_db["emailRegisterd"]
+swipe_sessions_collection = images_db["swipe_sessions"]
+generation_jobs_collection = images_db["generation_jobs"]
+
+R2_UPLOAD_WORKERS = int(os.getenv("R2_UPLOAD_WORKERS", "8"))
+IMAGE_VARIANT_WIDTHS = tuple(
+    int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640").split(",") if width.strip()
+)
+DEFAULT_DISPLAY_WIDTH = int(os.getenv("DEFAULT_DISPLAY_WIDTH", "640"))
 
 s3 = boto3.client(
     's3',
     endpoint_url=f'https://{ACCOUNT_ID}.r2.cloudflarestorage.com',
     aws_access_key_id=ACCESS_KEY_ID,
-    aws_secret_access_key=SECRET_ACCESS_KEY
+    aws_secret_access_key=SECRET_ACCESS_KEY,
+    # Enough pooled connections for every upload worker's multipart parts.
+    config=BotoConfig(max_pool_connections=R2_UPLOAD_WORKERS * 4),
 )
 
 def _env_flag(name: str, default: bool = False) -> bool:
@@ -67,7 +95,34 @@ ADMIN_EMAIL = (os.getenv("ADMIN_EMAIL") or "").strip().lower()
 if not ADMIN_EMAIL:
     raise RuntimeError("ADMIN_EMAIL environment variable must be set.")
 MAX_EARLY_ACCESS_PAGE_SIZE = 200
+WARDROBE_PAGE_SIZE = 60
+MAX_WARDROBE_PAGE_SIZE = 200
+MAX_WARDROBE_BATCH_SIZE = 100
+WARDROBE_WRITE_TIMEOUT_SECONDS = 60.0
 ENABLE_AI_GENERATION = _env_flag("ENABLE_AI_GENERATION", False)
+CATALOG_INDEX_ENABLED = _env_flag("CATALOG_INDEX_ENABLED", True)
+CATALOG_INDEX_REFRESH_SECONDS = float(os.getenv("CATALOG_INDEX_REFRESH_SECONDS", "60"))
+SWIPE_SESSION_TTL_SECONDS = int(os.getenv("SWIPE_SESSION_TTL_SECONDS", str(6 * 3600)))
+WEATHER_CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "600"))
+WEATHER_CACHE_STALE_SECONDS = float(os.getenv("WEATHER_CACHE_STALE_SECONDS", "3600"))
+WEATHER_PREFETCH_CITIES = int(os.getenv("WEATHER_PREFETCH_CITIES", "20"))
+RECOMMEND_IO_WORKERS = int(os.getenv("RECOMMEND_IO_WORKERS", "16"))
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "2"))
+GENERATION_QUEUE_SIZE = int(os.getenv("GENERATION_QUEUE_SIZE", "50"))
+GENAI_MAX_CONCURRENCY = int(os.getenv("GENAI_MAX_CONCURRENCY", "4"))
+GENERATE_DEADLINE_SECONDS = float(os.getenv("GENERATE_DEADLINE_SECONDS", "45"))
+RECOMMEND_STREAM_SECONDS = float(os.getenv("RECOMMEND_STREAM_SECONDS", "90"))
+RECOMMEND_STREAM_POLL_SECONDS = 5.0
+GENERATION_CACHE_REFRESH_RATE = float(os.getenv("GENERATION_CACHE_REFRESH_RATE", "0.1"))
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "5000"))
+GENERATION_CACHE_MAX_AGE_DAYS = int(os.getenv("GENERATION_CACHE_MAX_AGE_DAYS", "30"))
+INSTANT_SNAPSHOT_ENABLED = _env_flag("INSTANT_SNAPSHOT_ENABLED", True)
+AUTH_USER_CACHE_SECONDS = float(os.getenv("AUTH_USER_CACHE_SECONDS", "60"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+INSTANT_SNAPSHOT_POLL_SECONDS = float(os.getenv("INSTANT_SNAPSHOT_POLL_SECONDS", "60"))
+INSTANT_OUTFITS_CACHE_SECONDS = int(os.getenv("INSTANT_OUTFITS_CACHE_SECONDS", "60"))
+GENERATED_IMAGES_CACHE_SECONDS = int(os.getenv("GENERATED_IMAGES_CACHE_SECONDS", "60"))
 
 # --- Helpers ---
 fashion_synonyms = {
@@ -119,7 +174,35 @@ def canonical_name(filename: str) -> str:
 def safe_filename(name: str) -> str:
     return quote(name, safe='-_.')  
 
-def get_weather_bucket(city: str = "Sydney") -> dict[str, object] | None:
+def default_image_url(filename: str) -> str:
+    return f"{PUBLIC_URL_BASE}{safe_filename(filename)}"
+
+def resolve_catalog_image_url(doc: dict) -> str | None:
+    url = None
+    images = doc.get("images") or {}
+    if isinstance(images, dict):
+        url = images.get("full") or images.get("thumbnail")
+    if not url:
+        url = doc.get("image")
+    if not url and doc.get("filename"):
+        url = default_image_url(doc["filename"])
+    return url or None
+
+declare_index(swipe_sessions_collection, [("expires_at", 1)], expireAfterSeconds=0)
+swipe_sessions = SwipeSessionStore(swipe_sessions_collection, ttl_seconds=SWIPE_SESSION_TTL_SECONDS)
+
+declare_index(collection, [("created_at", -1)])
+declare_query(collection, "catalog index tail", {"created_at": {"$gte": datetime(2025, 1, 1)}}, sort=[("created_at", 1)])
+declare_index(collection, [("updated_at", -1)], sparse=True)
+declare_query(collection, "catalog index edits", {"updated_at": {"$gte": datetime(2025, 1, 1)}}, sort=[("updated_at", 1)])
+catalog_index = CatalogIndex(
+    collection,
+    resolve_catalog_image_url,
+    default_image_url,
+    refresh_interval=CATALOG_INDEX_REFRESH_SECONDS,
+)
+
+def fetch_weather_bucket(city: str = "Sydney") -> dict[str, object] | None:
     api_key = os.getenv("WEATHER_API")
     if not api_key:
         return None
@@ -155,6 +238,32 @@ def get_weather_bucket(city: str = "Sydney") -> dict[str, object] | None:
         "country": country,
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
+
+weather_cache = WeatherCache(
+    fetch_weather_bucket,
+    ttl=WEATHER_CACHE_TTL_SECONDS,
+    stale_ttl=WEATHER_CACHE_STALE_SECONDS,
+)
+weather_prefetcher = WeatherPrefetcher(weather_cache, top_n=WEATHER_PREFETCH_CITIES)
+_recommend_executor = ThreadPoolExecutor(
+    max_workers=RECOMMEND_IO_WORKERS, thread_name_prefix="recommend-io"
+)
+generation_cache = GenerationCache(
+    refresh_rate=GENERATION_CACHE_REFRESH_RATE,
+    max_age_days=GENERATION_CACHE_MAX_AGE_DAYS,
+    max_entries=GENERATION_CACHE_MAX_ENTRIES,
+)
+_genai_executor = ThreadPoolExecutor(
+    max_workers=GENAI_MAX_CONCURRENCY, thread_name_prefix="genai"
+)
+
+def get_weather_bucket(city: str = "Sydney") -> dict[str, object] | None:
+    if not os.getenv("WEATHER_API"):
+        return None
+    city = city or "Sydney"
+    weather_prefetcher.record(city)
+    return weather_cache.get(city)
+
 PASSWORD_REQUIREMENTS = re.compile(
     r"^(?=.*[A-Z])(?=.*[!@#$%^&*(),.?\":{}|<>\\/~`_\[\]\-+=]).{8,}$"
 )
@@ -164,19 +273,78 @@ def is_valid_password(password: str) -> bool:
         return False
     return bool(PASSWORD_REQUIREMENTS.match(password))
 
+r2_uploader = R2Uploader(s3, BUCKET, default_image_url, workers=R2_UPLOAD_WORKERS)
+
 def upload_to_r2(filename: str, file_bytes: bytes) -> str:
-    if not file_bytes:
-        return None
+    return r2_uploader.upload(filename, file_bytes)
+
+_ingest_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-ingest")
+
+def upload_with_variants(filename: str, image_bytes: bytes) -> dict | None:
+    """
+    Upload an image together with its resized WebP/AVIF variants and return
+    the `images` field for its catalog document (None if the original failed).
+    """
+    original = r2_uploader.submit(filename, image_bytes)
     try:
-        s3.upload_fileobj(io.BytesIO(file_bytes), BUCKET, filename)
-        return f"{PUBLIC_URL_BASE}{safe_filename(filename)}"
-    except (BotoCoreError, ClientError) as e:
-        print(f"Upload failed for {filename}: {e}")
+        variants = build_variants(image_bytes, IMAGE_VARIANT_WIDTHS)
+    except Exception as exc:
+        print(f"[DEBUG] Could not build variants for {filename}: {exc}")
+        variants = []
+    variant_uploads = [
+        (variant, r2_uploader.submit(
+            variant_filename(filename, variant["width"], variant["format"]),
+            variant["data"],
+            variant["content_type"],
+        ))
+        for variant in variants
+    ]
+
+    full_url = original.result()
+    if not full_url:
         return None
+    uploaded = []
+    for variant, upload in variant_uploads:
+        url = upload.result()
+        if url:
+            uploaded.append({
+                "url": url,
+                "width": variant["width"],
+                "height": variant["height"],
+                "format": variant["format"],
+            })
+    return images_field(full_url, uploaded)
+
+def images_field(full_url: str, variants: list[dict]) -> dict:
+    thumbnail = min(
+        (variant for variant in variants if variant["format"] == "webp"),
+        key=lambda variant: variant["width"],
+        default=None,
+    )
+    images = {"full": full_url, "thumbnail": thumbnail["url"] if thumbnail else full_url}
+    if variants:
+        images["variants"] = variants
+    return images
+
+def display_settings(request, data: dict | None = None) -> tuple[int, set[str]]:
+    """Target card width (JSON body or query string) and image formats the client can show."""
+    width = (data or {}).get("max_width") or request.GET.get("max_width")
+    try:
+        width = int(width or DEFAULT_DISPLAY_WIDTH)
+    except (TypeError, ValueError):
+        width = DEFAULT_DISPLAY_WIDTH
+    return max(1, width), accepted_formats(request.META.get("HTTP_ACCEPT"))
 
-def save_image_metadata(filename: str, keywords: list, r2_url: str, user_id=None):
+def display_image_url(doc: dict, full_url: str, max_width: int | None, formats: set[str]) -> str:
+    return pick_variant(doc.get("images"), max_width, formats) or full_url
+
+declare_index(collection, [("filename", 1)])
+declare_query(collection, "image by filename", {"filename": "casual___womenswear___hot___abc123.png"})
+def build_image_document(filename: str, keywords: list, r2_url: str, user_id=None, images=None, **extra) -> dict:
     """
-    Save image metadata and ensure all keywords are included as tags.
+    Build the full catalog document for an image, ensuring all keywords are
+    included as tags.  `extra` fields (e.g. `is_ai`) are part of the same
+    write, so the document never appears half-populated.
     """
     # Lowercase and deduplicate
     tags = list(set([k.lower() for k in keywords if k]))
@@ -185,20 +353,137 @@ def save_image_metadata(filename: str, keywords: list, r2_url: str, user_id=None
     if "womenswear" in filename.lower() and "womenswear" not in tags:
         tags.append("womenswear")
 
-    doc = {
+    return {
         "filename": filename,
         "tags": tags,
         "created_at": datetime.utcnow(),
-        "images": {"full": r2_url, "thumbnail": r2_url},
+        "images": images or {"full": r2_url, "thumbnail": r2_url},
         "source_url": r2_url,
-        "user_id": user_id
+        "user_id": user_id,
+        **extra,
     }
-    collection.insert_one(doc)
 
-def get_images(keywords: list, limit=TOTAL_IMAGES):
+def save_image_documents(docs: list[dict]) -> None:
+    if not docs:
+        return
+    if len(docs) == 1:
+        collection.insert_one(docs[0])
+    else:
+        collection.insert_many(docs, ordered=False)
+    for doc in docs:
+        catalog_index.add_document(doc)
+
+def save_image_metadata(filename: str, keywords: list, r2_url: str, user_id=None, images=None, **extra):
+    """
+    Save image metadata and ensure all keywords are included as tags.
+    """
+    save_image_documents([
+        build_image_document(filename, keywords, r2_url, user_id=user_id, images=images, **extra)
+    ])
+
+declare_index(collection, [("tags", 1), ("created_at", -1)])
+declare_query(
+    collection,
+    "recommend tier",
+    {"tags": {"$all": ["casual", "womenswear", "hot"]}, "filename": {"$nin": ["seen.png"]}},
+    sort=[("created_at", -1)],
+)
+declare_query(collection, "images by tag", {"tags": {"$in": ["casual", "outfit"]}}, sort=[("created_at", -1)])
+RECOMMEND_PROJECTION = {
+    "filename": 1,
+    "tags": 1,
+    "images.full": 1,
+    "images.thumbnail": 1,
+    "images.variants": 1,
+    "image": 1,
+    "source_url": 1,
+    "created_at": 1,
+}
+
+def build_recommend_pipeline(required_tags, exclude_names, limit: int, window: int) -> list[dict]:
+    """
+    One aggregation covering every recommend tier: unseen matches first
+    (tier 0), then previously seen ones (tier 1), each newest first, deduped
+    by filename and image URL and cut to exactly `limit` rows.
+    """
+    match: dict[str, object] = {}
+    if required_tags:
+        match["tags"] = {"$all": sorted(required_tags)}
+    projection = {"_id": 0, **RECOMMEND_PROJECTION}
+
+    def tier(number: int, extra_match: dict | None = None) -> list[dict]:
+        return [
+            {"$match": {**match, **(extra_match or {})}},
+            {"$sort": {"created_at": -1}},
+            {"$limit": window},
+            {"$project": projection},
+            {"$addFields": {"tier": number}},
+        ]
+
+    fresh_match = {"filename": {"$nin": list(exclude_names)}} if exclude_names else None
+    return [
+        *tier(0, fresh_match),
+        {"$unionWith": {"coll": collection.name, "pipeline": tier(1)}},
+        {"$sort": {"tier": 1, "created_at": -1}},
+        {"$group": {"_id": "$filename", "doc": {"$first": "$$ROOT"}}},
+        {"$replaceRoot": {"newRoot": "$doc"}},
+        {"$sort": {"tier": 1, "created_at": -1}},
+        {"$group": {
+            "_id": {"$ifNull": ["$images.full", "$images.thumbnail", "$image", "$filename"]},
+            "doc": {"$first": "$$ROOT"},
+        }},
+        {"$replaceRoot": {"newRoot": "$doc"}},
+        {"$sort": {"tier": 1, "created_at": -1}},
+        {"$limit": limit},
+    ]
+
+declare_index(collection, [("tags", 1), ("created_at", -1), ("_id", -1)])
+declare_query(
+    collection,
+    "recommend page",
+    {
+        "tags": {"$all": ["casual", "womenswear"]},
+        "filename": {"$nin": ["seen.png"]},
+        "$or": [
+            {"created_at": {"$lt": datetime(2025, 1, 1)}},
+            {"created_at": datetime(2025, 1, 1), "_id": {"$lt": ObjectId("0" * 24)}},
+        ],
+    },
+    sort=[("created_at", -1), ("_id", -1)],
+)
+def iter_recommend_pages(required_tags, exclude_names, page_size: int):
+    """
+    Matches newest first, one keyset page at a time, then the excluded names
+    as tier 1.  For swipe sessions: their Bloom filter can only be applied
+    in Python, so the caller keeps reading until it has enough unseen ones.
+    """
+    match: dict[str, object] = {}
+    if required_tags:
+        match["tags"] = {"$all": sorted(required_tags)}
+    fresh = {**match, "filename": {"$nin": list(exclude_names)}} if exclude_names else match
+    position = None
+    while True:
+        query = {**fresh, **keyset_after("created_at", position)} if position else fresh
+        page = list(
+            collection.find(query, RECOMMEND_PROJECTION)
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(page_size)
+        )
+        yield from page
+        if len(page) < page_size or not isinstance(page[-1].get("created_at"), datetime):
+            break
+        position = (page[-1]["created_at"], page[-1]["_id"])
+    if exclude_names:
+        seen = collection.find(
+            {**match, "filename": {"$in": list(exclude_names)}}, RECOMMEND_PROJECTION
+        ).sort("created_at", -1).limit(page_size)
+        for doc in seen:
+            yield {**doc, "tier": 1}
+
+def get_images(keywords: list, limit=TOTAL_IMAGES, max_width=None, formats=frozenset({"webp"})):
     results_cursor = collection.find(
         {"tags": {"$in": keywords}},
-        {"filename": 1, "tags": 1}
+        {"filename": 1, "tags": 1, "images.variants": 1}
     ).sort("created_at", -1).limit(limit)
 
     output = []
@@ -206,7 +491,7 @@ def get_images(keywords: list, limit=TOTAL_IMAGES):
         url = f"{PUBLIC_URL_BASE}{safe_filename(doc['filename'])}"
         output.append({
             "name": doc["filename"],
-            "image": url,
+            "image": display_image_url(doc, url, max_width, formats),
             "tags": doc.get("tags", []),
             "source_url": url
         })
@@ -244,6 +529,27 @@ def upload_and_segment(request):
 def recommend_page(request):
     return render(request, "recommend.html")
 
+declare_index(
+    users_collection, [("email", 1)], unique=True,
+    partialFilterExpression={"email": {"$type": "string"}},
+)
+declare_index(
+    users_collection, [("username", 1)], unique=True,
+    partialFilterExpression={"username": {"$type": "string"}},
+)
+declare_query(users_collection, "user by username", {"username": "someone@example.com"})
+declare_query(
+    users_collection,
+    "user by email or username",
+    {"$or": [{"email": "someone@example.com"}, {"username": "someone@example.com"}]},
+)
+password_pool = PasswordHashPool(workers=PASSWORD_HASH_WORKERS, max_queue=PASSWORD_HASH_QUEUE_SIZE)
+
+def hashing_busy_response() -> JsonResponse:
+    response = JsonResponse({"error": "Too many sign-ins right now, please try again."}, status=503)
+    response["Retry-After"] = "1"
+    return response
+
 @csrf_exempt
 def signup(request):
     if request.method == "POST":
@@ -261,7 +567,11 @@ def signup(request):
         if users_collection.find_one({"username": username}):
             messages.error(request, "Username already taken.")
             return redirect("signup")
-        password_hash = make_password(password)
+        try:
+            password_hash = password_pool.make_password(password)
+        except HashPoolBusy:
+            messages.error(request, "Too many sign-ups right now, please try again.")
+            return redirect("signup")
         users_collection.insert_one({
             "username": username,
             "password_hash": password_hash,
@@ -298,7 +608,10 @@ def signup_mongo(request):
     if existing_user:
         return JsonResponse({"error": "Email already registered."}, status=409)
 
-    password_hash = make_password(password)
+    try:
+        password_hash = password_pool.make_password(password)
+    except HashPoolBusy:
+        return hashing_busy_response()
     user_doc = {
         "email": email,
         "username": email,
@@ -336,22 +649,6 @@ def get_tokens_for_mongo_user(mongo_user_id: str):
         "access": str(refresh.access_token)
     }
 
-def decode_jwt(token):
-    try:
-        signing_key = jwt_api_settings.SIGNING_KEY or settings.SECRET_KEY
-        algorithms = [jwt_api_settings.ALGORITHM]
-        return jwt.decode(
-            token,
-            signing_key,
-            algorithms=algorithms,
-            options={"verify_aud": False},
-        )
-    except jwt.ExpiredSignatureError:
-        print("JWT expired")
-    except jwt.InvalidTokenError as exc:
-        print(f"Invalid JWT: {exc}")
-    return None
-
 # --- Login ---
 @csrf_exempt
 def login_mongo(request):
@@ -373,7 +670,20 @@ def login_mongo(request):
         {"$or": [{"email": email}, {"username": email}]}
     )
 
-    if not user or not check_password(password, user.get("password_hash", "")):
+    def upgrade_hash(raw_password):
+        # The stored hash was made at a different PASSWORD_HASH_ITERATIONS.
+        users_collection.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"password_hash": make_password(raw_password)}},
+        )
+
+    try:
+        valid = bool(user) and password_pool.check_password(
+            password, user.get("password_hash", ""), upgrade_hash
+        )
+    except HashPoolBusy:
+        return hashing_busy_response()
+    if not valid:
         return JsonResponse({"error": "Invalid credentials"}, status=401)
 
     tokens = get_tokens_for_mongo_user(user["_id"])
@@ -393,25 +703,32 @@ def login_mongo(request):
         }
     )
 
-def get_auth_token(request):
-    """Extract the Bearer token from headers."""
-    auth = request.headers.get("Authorization") or request.META.get("HTTP_AUTHORIZATION")
-    if auth and auth.startswith("Bearer "):
-        return auth.split(" ")[1]
-    return None
+user_cache = TTLCache(ttl=AUTH_USER_CACHE_SECONDS)
+
+def get_user_document(user_id: str) -> dict | None:
+    """The account for `user_id`, cached per process for AUTH_USER_CACHE_SECONDS."""
+    def load():
+        try:
+            object_id = ObjectId(user_id)
+        except InvalidId:
+            return None
+        return users_collection.find_one(
+            {"_id": object_id},
+            {"email": 1, "username": 1, "display_name": 1},
+        )
+    return user_cache.get_or_load(user_id, load)
 
 
 def ensure_admin(request):
     """Verify the requester is the configured administrator."""
-    token = get_auth_token(request)
-    if not token:
+    auth = request_auth(request)
+    if not auth.token:
         return JsonResponse(
             {"detail": "Authentication credentials were not provided."},
             status=401,
         )
 
-    decoded = decode_jwt(token)
-    user_id = decoded.get("user_id") if decoded else None
+    user_id = auth.user_id
     if not user_id:
         return JsonResponse(
             {"detail": "Invalid or expired token."},
@@ -419,7 +736,7 @@ def ensure_admin(request):
         )
 
     try:
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
+        user = get_user_document(user_id)
     except Exception:
         user = None
 
@@ -435,20 +752,121 @@ def ensure_admin(request):
 
     return None
 
+# Unique so saves can upsert; `manage.py dedupe_wardrobe` clears older duplicates first.
+declare_index(wardrobe_collection, [("user_id", 1), ("filename", 1)], unique=True)
+declare_index(wardrobe_collection, [("user_id", 1), ("saved_at", -1), ("_id", -1)])
+declare_index(wardrobe_collection, [("user_id", 1), ("version", 1)])
+declare_query(
+    wardrobe_collection,
+    "wardrobe item",
+    {"user_id": "0" * 24, "filename": "look.png", "deleted": {"$ne": True}},
+)
+declare_query(
+    wardrobe_collection,
+    "wardrobe page",
+    {"user_id": "0" * 24, "deleted": {"$ne": True}},
+    sort=[("saved_at", -1), ("_id", -1)],
+)
+declare_query(wardrobe_collection, "wardrobe changes", {"user_id": "0" * 24, "version": {"$gt": 1}})
+
+# Removed items stay behind as tombstones (`deleted: True`) so delta syncs can
+# report them; every read of the live wardrobe filters them out.
+LIVE_WARDROBE_ITEM = {"deleted": {"$ne": True}}
+
+def wardrobe_version(user_id: str) -> int:
+    """
+    Newest committed change to the user's wardrobe (0 if never changed).
+    Each written item or tombstone is stamped with the version of its change;
+    a version is only published once its write and every earlier one has
+    finished, so a reader never sees a version whose items are still missing.
+    """
+    doc = wardrobe_versions_collection.find_one(
+        {"_id": user_id}, {"version": 1, "committed": 1, "pending": 1}
+    )
+    if not doc:
+        return 0
+    if "committed" in doc:
+        return int(doc["committed"])
+    # Counters from before publishing had no pending list.
+    return 0 if "pending" in doc else int(doc.get("version", 0))
+
+def bump_wardrobe_version(user_id: str) -> tuple[int, ObjectId]:
+    """
+    Allocate the version for a change and register it as pending; pass the
+    returned token to `publish_wardrobe_version` after the write.
+    """
+    token = ObjectId()
+    doc = wardrobe_versions_collection.find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {"version": 1}, "$push": {"pending": {"token": token, "at": datetime.utcnow()}}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return int(doc["version"]), token
+
+def publish_wardrobe_version(user_id: str, token: ObjectId) -> None:
+    """
+    Finish a change.  Writes of one user can finish out of order (e.g. a
+    background generation and a save), so `committed` only moves up to the
+    allocated version once no other change is pending; the last writer to
+    finish publishes for all of them.  Changes pending for longer than
+    WARDROBE_WRITE_TIMEOUT_SECONDS belong to a dead worker and stop blocking.
+    """
+    doc = wardrobe_versions_collection.find_one_and_update(
+        {"_id": user_id},
+        {"$pull": {"pending": {"token": token}}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not doc:
+        return
+    cutoff = datetime.utcnow() - timedelta(seconds=WARDROBE_WRITE_TIMEOUT_SECONDS)
+    pending = doc.get("pending") or []
+    live = [change for change in pending if change.get("at") and change["at"] >= cutoff]
+    if len(live) < len(pending):
+        wardrobe_versions_collection.update_one(
+            {"_id": user_id}, {"$pull": {"pending": {"at": {"$lt": cutoff}}}}
+        )
+    if not live:
+        wardrobe_versions_collection.update_one(
+            {"_id": user_id}, {"$max": {"committed": int(doc["version"])}}
+        )
+
+def wardrobe_save_operation(user_id: str, filename: str, image_url: str, tags, version: int) -> UpdateOne:
+    """Idempotent save: re-saving (or reviving a tombstone) updates the one document."""
+    return UpdateOne(
+        {"user_id": user_id, "filename": filename},
+        {
+            "$set": {
+                "image_url": image_url,
+                "tags": tags,
+                "saved_at": datetime.utcnow(),
+                "version": version,
+                "deleted": False,
+            },
+            "$unset": {"deleted_at": ""},
+        },
+        upsert=True,
+    )
+
+def wardrobe_delete_operation(user_id: str, filename: str, version: int) -> UpdateOne:
+    """Turn the live item into a tombstone for delta sync."""
+    return UpdateOne(
+        {"user_id": user_id, "filename": filename, **LIVE_WARDROBE_ITEM},
+        {"$set": {"deleted": True, "deleted_at": datetime.utcnow(), "version": version}},
+    )
+
 @csrf_exempt
 def save_image(request):
     if request.method != "POST":
         return JsonResponse({"error": "Invalid request"}, status=400)
 
-    token = get_auth_token(request)
-    if not token:
+    auth = request_auth(request)
+    if not auth.token:
         return JsonResponse({"error": "Unauthorized"}, status=401)
-
-    decoded = decode_jwt(token)
-    if not decoded:
+    if not auth.user_id:
         return JsonResponse({"error": "Invalid token"}, status=401)
 
-    user_id = str(decoded["user_id"])
+    user_id = auth.user_id
     data = json.loads(request.body)
     filename = data.get("filename")
     image_url = data.get("image_url")
@@ -457,13 +875,13 @@ def save_image(request):
     if not filename or not image_url:
         return JsonResponse({"error": "Missing data"}, status=400)
 
-    wardrobe_collection.insert_one({
-        "user_id": user_id,
-        "filename": filename,
-        "image_url": image_url,
-        "tags": tags,
-        "saved_at": datetime.utcnow()
-    })
+    version, token = bump_wardrobe_version(user_id)
+    try:
+        wardrobe_collection.bulk_write([
+            wardrobe_save_operation(user_id, filename, image_url, tags, version)
+        ])
+    finally:
+        publish_wardrobe_version(user_id, token)
 
     return JsonResponse({"success": True})
 
@@ -472,54 +890,251 @@ def delete_wardrobe_item(request, filename):
     if request.method != "DELETE":
         return JsonResponse({"error": "Invalid request"}, status=400)
 
-    # Get token from headers
-    token = get_auth_token(request)
-    if not token:
+    auth = request_auth(request)
+    if not auth.token:
         return JsonResponse({"error": "Unauthorized"}, status=401)
-
-    decoded = decode_jwt(token)
-    if not decoded:
+    if not auth.user_id:
         return JsonResponse({"error": "Invalid token"}, status=401)
 
-    user_id = str(decoded["user_id"])
-    item = wardrobe_collection.find_one({"filename": filename, "user_id": user_id})
-    if not item:
+    user_id = auth.user_id
+    # A miss must not publish a version: that would change every client's
+    # ETag and sync position for nothing.
+    live = wardrobe_collection.find_one(
+        {"user_id": user_id, "filename": filename, **LIVE_WARDROBE_ITEM}, {"_id": 1}
+    )
+    if not live:
         return JsonResponse({"error": "Item not found"}, status=404)
 
-    # Just remove the wardrobe link (not the actual image or R2 object)
-    wardrobe_collection.delete_one({"filename": filename, "user_id": user_id})
+    # Just remove the wardrobe link (not the actual image or R2 object),
+    # leaving a tombstone for delta sync.
+    version, token = bump_wardrobe_version(user_id)
+    try:
+        result = wardrobe_collection.bulk_write([
+            wardrobe_delete_operation(user_id, filename, version)
+        ])
+    finally:
+        publish_wardrobe_version(user_id, token)
+    if not result.matched_count:
+        return JsonResponse({"error": "Item not found"}, status=404)
 
     return JsonResponse({"message": "Item removed from wardrobe"})
 
 @csrf_exempt
-def get_wardrobe(request):
-    if request.method != "GET":
+def wardrobe_batch(request):
+    """
+    Apply many wardrobe saves and deletes in one `bulk_write`.
+
+    Body: {"operations": [{"op": "save", "filename", "image_url", "tags"},
+    {"op": "delete", "filename"}, ...]}.  Returns one result per operation,
+    in order, with a status of created, updated, deleted, not_found,
+    invalid or error.
+    """
+    if request.method != "POST":
         return JsonResponse({"error": "Invalid request"}, status=400)
 
-    token = get_auth_token(request)
-    if not token:
+    auth = request_auth(request)
+    if not auth.token:
         return JsonResponse({"error": "Unauthorized"}, status=401)
-
-    decoded = decode_jwt(token)
-    if not decoded:
+    if not auth.user_id:
         return JsonResponse({"error": "Invalid token"}, status=401)
 
-    user_id = str(decoded["user_id"])
-    saved_items = list(wardrobe_collection.find({"user_id": user_id}))
-    wardrobe = [{
+    try:
+        operations = json.loads(request.body).get("operations")
+    except (ValueError, AttributeError):
+        operations = None
+    if not isinstance(operations, list):
+        return JsonResponse({"error": "operations must be a list"}, status=400)
+    if len(operations) > MAX_WARDROBE_BATCH_SIZE:
+        return JsonResponse(
+            {"error": f"At most {MAX_WARDROBE_BATCH_SIZE} operations per batch"},
+            status=400,
+        )
+
+    user_id = auth.user_id
+    results = []
+    valid = []  # (result index, op, filename, data)
+    for index, data in enumerate(operations):
+        op = data.get("op") if isinstance(data, dict) else None
+        filename = data.get("filename") if isinstance(data, dict) else None
+        results.append({"op": op, "filename": filename})
+        if op == "save" and filename and data.get("image_url"):
+            valid.append((index, op, filename, data))
+        elif op == "delete" and filename:
+            valid.append((index, op, filename, data))
+        elif op not in ("save", "delete"):
+            results[index].update(status="invalid", error="Unknown operation")
+        else:
+            results[index].update(status="invalid", error="Missing data")
+
+    if not valid:
+        return JsonResponse({"results": results, "version": wardrobe_version(user_id)})
+
+    # Deletes of items that are not in the wardrobe report not_found; one read
+    # covers the whole batch.
+    delete_names = [filename for _, op, filename, _ in valid if op == "delete"]
+    live_names = set()
+    if delete_names:
+        live_names = set(wardrobe_collection.distinct(
+            "filename",
+            {"user_id": user_id, "filename": {"$in": delete_names}, **LIVE_WARDROBE_ITEM},
+        ))
+
+    planned = []
+    for index, op, filename, data in valid:
+        if op == "delete" and filename not in live_names:
+            results[index]["status"] = "not_found"
+        else:
+            planned.append((index, op, filename, data))
+    if not planned:
+        return JsonResponse({"results": results, "version": wardrobe_version(user_id)})
+
+    version, token = bump_wardrobe_version(user_id)
+    writes = []
+    write_results = []  # bulk_write position -> result index
+    for index, op, filename, data in planned:
+        if op == "save":
+            writes.append(wardrobe_save_operation(
+                user_id, filename, data["image_url"], data.get("tags", []), version
+            ))
+            results[index]["status"] = "updated"
+        else:
+            writes.append(wardrobe_delete_operation(user_id, filename, version))
+            results[index]["status"] = "deleted"
+        write_results.append(index)
+
+    try:
+        result = wardrobe_collection.bulk_write(writes, ordered=False)
+        upserted = result.upserted_ids
+    except BulkWriteError as exc:
+        details = exc.details or {}
+        upserted = {item["index"]: item["_id"] for item in details.get("upserted", [])}
+        for error in details.get("writeErrors", []):
+            results[write_results[error["index"]]].update(
+                status="error", error=error.get("errmsg", "Write failed")
+            )
+    finally:
+        publish_wardrobe_version(user_id, token)
+    for position in upserted:
+        results[write_results[position]]["status"] = "created"
+
+    return JsonResponse({"results": results, "version": version})
+
+def wardrobe_entry(item: dict) -> dict:
+    return {
         "name": item["filename"],
         "image": item["image_url"],
         "tags": item.get("tags", [])
-    } for item in saved_items]
+    }
+
+def wardrobe_changes(user_id: str, since: int, version: int) -> dict:
+    """Items saved and names removed after wardrobe version `since`."""
+    if since >= version:
+        return {"added": [], "deleted": [], "version": version}
+    changes = wardrobe_collection.find(
+        {"user_id": user_id, "version": {"$gt": since}},
+        {"filename": 1, "image_url": 1, "tags": 1, "deleted": 1, "version": 1},
+    ).sort("version", 1)
+    added: dict[str, dict] = {}
+    deleted: set[str] = set()
+    for item in changes:
+        name = item["filename"]
+        if item.get("deleted"):
+            added.pop(name, None)
+            deleted.add(name)
+        else:
+            # Removed and saved again since `since`: the client should keep it.
+            deleted.discard(name)
+            added[name] = wardrobe_entry(item)
+    return {"added": list(added.values()), "deleted": sorted(deleted), "version": version}
+
+def request_wardrobe_version(request, user_id: str) -> int:
+    """`wardrobe_version` read once per request, shared by the validator and the view."""
+    version = getattr(request, "wardrobe_version", None)
+    if version is None:
+        version = wardrobe_version(user_id)
+        request.wardrobe_version = version
+    return version
+
+def wardrobe_validator(request) -> str | None:
+    """
+    ETag source for `get_wardrobe`: the committed wardrobe version, read
+    before the view builds the body, so the body is never older than the
+    version it is tagged with.  That one point read by `_id` is all a 304
+    costs; on a 200 the view reuses it.
+    """
+    user_id = request_auth(request).user_id
+    if not user_id:
+        return None
+    return f"wardrobe:{user_id}:{request_wardrobe_version(request, user_id)}:{request.GET.urlencode()}"
+
+# Per-user data: browsers may keep it but must revalidate each time.
+@cache_policy(PRIVATE_REVALIDATE, validator=wardrobe_validator, vary=("Authorization",))
+@csrf_exempt
+def get_wardrobe(request):
+    """
+    One page of the user's wardrobe, newest first.  Follow `next_cursor`
+    (passed back as `cursor`) for the next page; `limit` sets the page size.
+    The ETag is derived from the wardrobe version, so a matching
+    If-None-Match gets a 304 without reading the wardrobe items.
+
+    With `since=<version>` (the `version` of an earlier response) it returns
+    only what changed after that point: `added` items and `deleted` names.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Invalid request"}, status=400)
+
+    auth = request_auth(request)
+    if not auth.token:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    if not auth.user_id:
+        return JsonResponse({"error": "Invalid token"}, status=401)
+
+    user_id = auth.user_id
+    try:
+        limit = int(request.GET.get("limit", WARDROBE_PAGE_SIZE))
+    except (TypeError, ValueError):
+        limit = WARDROBE_PAGE_SIZE
+    limit = max(1, min(limit, MAX_WARDROBE_PAGE_SIZE))
 
-    return JsonResponse({"wardrobe": wardrobe})
+    cursor_token = request.GET.get("cursor")
+    position = decode_page_cursor(cursor_token)
+    if cursor_token and position is None:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
 
-def generate(base_tags, image_count_per_weather=3, user_id=None):
+    since = request.GET.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except (TypeError, ValueError):
+            return JsonResponse({"error": "Invalid since"}, status=400)
+
+    version = request_wardrobe_version(request, user_id)
+    if since is not None:
+        return JsonResponse(wardrobe_changes(user_id, since, version))
+
+    query = {"user_id": user_id, **LIVE_WARDROBE_ITEM}
+    if position:
+        query.update(keyset_after("saved_at", position))
+    saved_items = list(
+        wardrobe_collection.find(query, {"filename": 1, "image_url": 1, "tags": 1, "saved_at": 1})
+        .sort([("saved_at", -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    next_cursor = None
+    if len(saved_items) > limit:
+        saved_items = saved_items[:limit]
+        last = saved_items[-1]
+        if isinstance(last.get("saved_at"), datetime):
+            next_cursor = encode_page_cursor(last["saved_at"], last["_id"])
+    wardrobe = [wardrobe_entry(item) for item in saved_items]
+    return JsonResponse({"wardrobe": wardrobe, "next_cursor": next_cursor, "version": version})
+
+def generate(base_tags, image_count_per_weather=3, user_id=None, weather=None, on_outfit=None):
     if not ENABLE_AI_GENERATION:
         print("[DEBUG] AI generation disabled via ENABLE_AI_GENERATION")
         return
 
-    weather_types = ["hot", "cold"]
+    weather_types = [weather] if weather else ["hot", "cold"]
 
     normalized_tags = []
     for tag in base_tags or []:
@@ -533,10 +1148,32 @@ def generate(base_tags, image_count_per_weather=3, user_id=None):
     # Join the normalized tags into a single query prompt
     query = " ".join(normalized_tags)
 
-    time.sleep(1)
+    # Weather-specific runs are tagged with their bucket so weather-aware
+    # recommend queries can find them.
+    image_tags = list(normalized_tags)
+    if weather and weather not in image_tags:
+        image_tags.append(weather)
 
     for weather in weather_types:
+        uploads = []
+        image_docs = []
+        wardrobe_items = []
+        cache_keys = [cache_key(normalized_tags, weather, i) for i in range(image_count_per_weather)]
+        cached = generation_cache.lookup(cache_keys)
         for i in range(image_count_per_weather):
+            entry = cached.get(cache_keys[i])
+            if entry is not None:
+                # Already generated for this prompt; it is in the catalog.
+                if user_id and entry.filename:
+                    wardrobe_items.append((entry.filename, entry.image, entry.tags))
+                if on_outfit is not None and entry.filename:
+                    on_outfit({
+                        "filename": entry.filename,
+                        "tags": entry.tags,
+                        "images": {"full": entry.image},
+                        "source_url": entry.image,
+                    })
+                continue
             try:
                 prompt_text = (
                     f"{query} women's fashion single outfit flatlay, "
@@ -559,49 +1196,147 @@ def generate(base_tags, image_count_per_weather=3, user_id=None):
                         storage_filename = f"{safe_keywords}___{weather}___{random_suffix}.png"
                         search_filename = f"GENERATED_{safe_keywords}___{weather}___{random_suffix}.png"
 
-                        # Upload to R2
-                        r2_url = upload_to_r2(storage_filename, image_bytes)
-                        if r2_url:
-                            print(f"[DEBUG] Uploaded image to R2: {r2_url}")
-
-                            # Save metadata in DB with the selected quiz tags
-                            save_image_metadata(
-                                storage_filename,
-                                normalized_tags,
-                                r2_url,
-                                user_id=user_id
-                            )
-                            print(f"[DEBUG] Saved image metadata to DB: {storage_filename}")
-
-                            # Mark as AI-generated
-                            collection.update_one(
-                                {"filename": storage_filename},
-                                {"$set": {"search_filename": search_filename, "is_ai": True}}
-                            )
-                            print(f"[DEBUG] Marked image as AI-generated")
-
-                            # Save to user's wardrobe if logged in
-                            if user_id:
-                                wardrobe_collection.insert_one({
-                                    "user_id": user_id,
-                                    "filename": storage_filename,
-                                    "image_url": r2_url,
-                                    "tags": normalized_tags,
-                                    "saved_at": datetime.utcnow()
-                                })
+                        # Upload to R2 (with variants) while the next
+                        # variation is generated
+                        uploads.append((
+                            storage_filename,
+                            search_filename,
+                            cache_keys[i],
+                            _ingest_executor.submit(upload_with_variants, storage_filename, image_bytes),
+                        ))
 
             except Exception as e:
                 print(f"[DEBUG] Error generating {weather} image for '{query}': {e}")
 
+        cache_entries = []
+        for storage_filename, search_filename, key, upload in uploads:
+            images = upload.result()
+            if not images:
+                continue
+            r2_url = images["full"]
+            print(f"[DEBUG] Uploaded image to R2: {r2_url}")
+
+            # Metadata with the selected quiz tags, already marked as AI-generated
+            image_docs.append(build_image_document(
+                storage_filename,
+                image_tags,
+                r2_url,
+                user_id=user_id,
+                images=images,
+                search_filename=search_filename,
+                is_ai=True,
+            ))
+            cache_entries.append((key, r2_url, storage_filename))
+
+            # Save to user's wardrobe if logged in
+            if user_id:
+                wardrobe_items.append((storage_filename, r2_url, image_tags))
+
+        # One batched write per collection for the whole run
+        try:
+            save_image_documents(image_docs)
+            if wardrobe_items:
+                # Upserts, since a cached image may already be in the wardrobe.
+                version, token = bump_wardrobe_version(user_id)
+                try:
+                    wardrobe_collection.bulk_write([
+                        wardrobe_save_operation(user_id, filename, image_url, tags, version)
+                        for filename, image_url, tags in wardrobe_items
+                    ], ordered=False)
+                finally:
+                    publish_wardrobe_version(user_id, token)
+            if image_docs:
+                print(f"[DEBUG] Saved {len(image_docs)} {weather} image(s) to DB")
+        except Exception as e:
+            print(f"[DEBUG] Error saving {weather} images for '{query}': {e}")
+            continue
+
+        for key, r2_url, storage_filename in cache_entries:
+            generation_cache.store(key, r2_url, storage_filename, image_tags)
+        if on_outfit is not None:
+            for doc in image_docs:
+                on_outfit(doc)
+
+generation_events = GenerationEvents()
+
+def run_generation_job(job: dict) -> None:
+    key = job.get("key") or job_key(job.get("tags"), job.get("weather"))
+    try:
+        generate(
+            job.get("tags") or [],
+            job.get("image_count") or 2,
+            job.get("user_id"),
+            weather=job.get("weather"),
+            on_outfit=lambda doc: generation_events.publish(key, doc),
+        )
+    finally:
+        generation_events.finish(key)
+
+declare_index(
+    generation_jobs_collection, [("key", 1)], unique=True,
+    partialFilterExpression={"active": True},
+)
+declare_index(generation_jobs_collection, [("status", 1), ("created_at", 1)])
+declare_index(generation_jobs_collection, [("finished_at", 1)], expireAfterSeconds=7 * 24 * 3600)
+declare_query(
+    generation_jobs_collection,
+    "pending generation jobs",
+    {"status": "pending", "created_at": {"$lt": datetime(2025, 1, 1)}},
+    sort=[("created_at", 1)],
+)
+generation_scheduler = GenerationScheduler(
+    run_generation_job,
+    generation_jobs_collection,
+    workers=GENERATION_WORKERS,
+    max_queue=GENERATION_QUEUE_SIZE,
+)
+
+declare_index(collection, [("is_ai", 1), ("tags", 1), ("created_at", -1)])
+declare_query(
+    collection,
+    "generated images",
+    {"tags": {"$in": ["casual", "womenswear"]}, "is_ai": True},
+    sort=[("created_at", -1)],
+)
+
 # --- Get AI-generated Images ---
-@api_view(["POST"])
+def generated_images_validator(request) -> str | None:
+    """
+    The catalog index's version, read without a round trip.  It covers the
+    whole catalog rather than just generated images, so unrelated writes only
+    cost a 200.  Other workers' writes show up after the next index refresh.
+    """
+    if not (CATALOG_INDEX_ENABLED and catalog_index.ensure_ready()):
+        return None
+    version = catalog_index.version
+    if version is None:
+        return None
+    formats = ",".join(sorted(accepted_formats(request.META.get("HTTP_ACCEPT"))))
+    return f"generated:{version}:{formats}:{request.GET.urlencode()}"
+
+# GET (query-string filters) is shareable at the edge; POST is not cacheable.
+@cache_policy(
+    lambda request: (
+        f"public, max-age={GENERATED_IMAGES_CACHE_SECONDS}"
+        if request.method == "GET" else NO_STORE
+    ),
+    validator=generated_images_validator,
+    vary=("Accept",),
+)
+@api_view(["GET", "POST"])
 @permission_classes([AllowAny])
 @csrf_exempt
 def get_generated_images(request):
-    try:
-        data = json.loads(request.body or "{}")
-    except json.JSONDecodeError:
-        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    if request.method == "GET":
+        data = {
+            key: values if len(values) > 1 else values[0]
+            for key, values in request.GET.lists()
+        }
+    else:
+        try:
+            data = json.loads(request.body or "{}")
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
 
     styles = _collect_values(data, "styles", "style")
     colours = _collect_values(data, "colours", "colour", "colors", "color")
@@ -616,6 +1351,8 @@ def get_generated_images(request):
 
     print(f"[DEBUG] get_generated_images keywords: {keywords}")
 
+    max_width, formats = display_settings(request, data)
+
     # Only fetch AI-generated images
     ai_images = list(collection.find(
         {"tags": {"$in": keywords}, "is_ai": True},
@@ -629,27 +1366,51 @@ def get_generated_images(request):
         url = doc["images"]["full"]
         output.append({
             "name": doc["filename"],
-            "image": url,
+            "image": display_image_url(doc, url, max_width, formats),
             "tags": doc.get("tags", []),
             "source_url": url
         })
 
     return JsonResponse({"outfits": output})
 
-@api_view(["POST"])
-@permission_classes([AllowAny])
-@csrf_exempt
-def generate_outfits(request):
-    if not ENABLE_AI_GENERATION:
-        return JsonResponse(
-            {"error": "AI generation is disabled."},
-            status=503,
-        )
-    try:
-        data = json.loads(request.body or "{}")
-    except json.JSONDecodeError:
-        return JsonResponse({"error": "Invalid JSON"}, status=400)
+def generate_image_bytes(prompt_text: str) -> bytes | None:
+    response = genai_client.models.generate_content(
+        model='gemini-2.5-flash-image-preview',
+        contents=[prompt_text],
+    )
+    for part in response.candidates[0].content.parts:
+        if getattr(part, 'inline_data', None):
+            return part.inline_data.data
+    return None
 
+def generated_storage_name(prompt_tokens: list[str]) -> str:
+    random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
+    keywords_slug = '___'.join(prompt_tokens) if prompt_tokens else 'casual_womenswear'
+    return f"{keywords_slug}___ai___{random_suffix}.png"
+
+def persist_generated_image(storage_name: str, image_bytes: bytes, tags: list[str], key: str | None = None):
+    """
+    Upload (with variants) in the background and record the image once R2
+    has it; `key` also stores it in the generation cache.
+    """
+    def ingest():
+        images = upload_with_variants(storage_name, image_bytes)
+        if images:
+            save_image_metadata(storage_name, tags, images["full"], images=images)
+            if key:
+                generation_cache.store(key, images["full"], storage_name, tags)
+        return images
+    return _ingest_executor.submit(ingest)
+
+def persist_generated_future(future, tags: list[str], key: str | None = None) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    image_bytes = future.result()
+    if image_bytes:
+        persist_generated_image(generated_storage_name(tags), image_bytes, tags, key)
+
+def generation_request(data: dict) -> tuple[int, list[str], str]:
+    """Parse image count and prompt tokens for the generate endpoints."""
     styles = _collect_values(data, "styles", "style")
     body_shapes = _collect_values(data, "bodyShapes", "bodyShape")
     occasions = _collect_values(data, "occasions", "occasion")
@@ -670,32 +1431,72 @@ def generate_outfits(request):
         prompt_tokens.append(primary_occasion)
     prompt_tokens = [token for token in prompt_tokens if token]
     prompt_query = " ".join(prompt_tokens) or "casual womenswear"
+    return image_count, prompt_tokens, prompt_query
 
-    ai_images = []
-    for idx in range(image_count):
+def submit_variations(prompt_tokens: list[str], prompt_query: str, image_count: int) -> tuple[dict, list]:
+    """
+    Start Gemini calls for the variations the generation cache does not
+    serve.  Returns {future: cache key} and the cached entries.
+    """
+    keys = [cache_key(prompt_tokens, None, idx) for idx in range(image_count)]
+    cached = generation_cache.lookup(keys)
+    futures = {}
+    for idx, key in enumerate(keys):
+        if key in cached:
+            continue
         prompt_text = (
             f"{prompt_query} women's fashion single outfit flatlay, "
             f"high quality, white background, different accessories, variation {idx + 1}"
         )
-        try:
-            response = genai_client.models.generate_content(
-                model='gemini-2.5-flash-image-preview',
-                contents=[prompt_text],
+        futures[_genai_executor.submit(generate_image_bytes, prompt_text)] = key
+    return futures, [cached[key] for key in keys if key in cached]
+
+def cached_outfit(entry) -> dict:
+    return {
+        "name": f"GENERATED_{entry.filename or entry.query}",
+        "image": entry.image,
+        "tags": entry.tags,
+        "source_url": entry.image,
+    }
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@csrf_exempt
+def generate_outfits(request):
+    if not ENABLE_AI_GENERATION:
+        return JsonResponse(
+            {"error": "AI generation is disabled."},
+            status=503,
+        )
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    image_count, prompt_tokens, prompt_query = generation_request(data)
+    futures, cached = submit_variations(prompt_tokens, prompt_query, image_count)
+
+    # Return whatever finished by the deadline; stragglers still end up in
+    # the catalog once they complete.
+    done, pending = wait(futures, timeout=GENERATE_DEADLINE_SECONDS)
+    for future in pending:
+        if not future.cancel():
+            future.add_done_callback(
+                lambda finished, key=futures[future]: persist_generated_future(finished, prompt_tokens, key)
             )
 
-            for part in response.candidates[0].content.parts:
-                if getattr(part, 'inline_data', None):
-                    ai_images.append(part.inline_data.data)
-                    break
+    outfits = [cached_outfit(entry) for entry in cached]
+    for future in done:
+        try:
+            image_bytes = future.result()
         except Exception as exc:
-            print(f"[DEBUG] Error generating image for '{prompt_text}': {exc}")
+            print(f"[DEBUG] Error generating image for '{prompt_query}': {exc}")
+            continue
+        if not image_bytes:
+            continue
 
-    outfits = []
-    for image_bytes in ai_images:
         img_b64 = base64.b64encode(image_bytes).decode("utf-8")
-        random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
-        keywords_slug = '___'.join(prompt_tokens) if prompt_tokens else 'casual_womenswear'
-        storage_name = f"{keywords_slug}___ai___{random_suffix}.png"
+        storage_name = generated_storage_name(prompt_tokens)
         display_name = f"GENERATED_{storage_name}"
 
         outfits.append({
@@ -705,22 +1506,141 @@ def generate_outfits(request):
             "source_url": None
         })
 
-        r2_url = upload_to_r2(storage_name, image_bytes)
-        if r2_url:
-            save_image_metadata(storage_name, prompt_tokens, r2_url)
+        persist_generated_image(storage_name, image_bytes, prompt_tokens, futures[future])
 
     random.shuffle(outfits)
     return JsonResponse({"outfits": outfits[:image_count]})
 
-@api_view(["POST"])
-@permission_classes([AllowAny])
+async def iterate_in_thread(iterator, batch_size: int = 1):
+    """
+    Async iterator over a blocking sync iterator, advanced `batch_size` items
+    at a time in a worker thread.  Under ASGI, Django reads a sync iterator
+    given to StreamingHttpResponse to the end before sending anything.
+    """
+    iterator = iter(iterator)
+    pull = sync_to_async(lambda: list(islice(iterator, batch_size)), thread_sensitive=False)
+    try:
+        while True:
+            batch = await pull()
+            if not batch:
+                return
+            for item in batch:
+                yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=False)()
+
+def stream_events(events, sse: bool) -> StreamingHttpResponse:
+    """Wrap a (sync or async) iterator of (event, payload) pairs as SSE or NDJSON."""
+    def line(event, payload) -> str:
+        if sse:
+            return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps({"type": event, **payload}) + "\n"
+
+    if not hasattr(events, "__aiter__"):
+        events = iterate_in_thread(events)
+
+    async def aencode():
+        async for event, payload in events:
+            yield line(event, payload)
+
+    response = StreamingHttpResponse(
+        aencode(),
+        content_type="text/event-stream" if sse else "application/x-ndjson",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+def wants_sse(request) -> bool:
+    return (
+        request.GET.get("format") == "sse"
+        or "text/event-stream" in request.META.get("HTTP_ACCEPT", "")
+    )
+
 @csrf_exempt
-def recommend(request):
+def generate_outfits_stream(request):
+    """
+    Streaming variant of `generate_outfits`: each outfit is sent as soon as
+    it is generated and uploaded, as NDJSON lines or Server-Sent Events
+    (`?format=sse` or `Accept: text/event-stream`).  Outfits reference their
+    R2 URL instead of inline base64, and each image's bytes are released
+    once uploaded.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required"}, status=405)
+    if not ENABLE_AI_GENERATION:
+        return JsonResponse({"error": "AI generation is disabled."}, status=503)
     try:
         data = json.loads(request.body or "{}")
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON"}, status=400)
 
+    image_count, prompt_tokens, prompt_query = generation_request(data)
+    max_width, formats = display_settings(request, data)
+
+    def events():
+        futures, cached = submit_variations(prompt_tokens, prompt_query, image_count)
+        for entry in cached:
+            yield "outfit", cached_outfit(entry)
+        handled = set()
+        sent = len(cached)
+        timed_out = False
+        try:
+            for future in as_completed(futures, timeout=GENERATE_DEADLINE_SECONDS):
+                handled.add(future)
+                try:
+                    image_bytes = future.result()
+                except Exception as exc:
+                    print(f"[DEBUG] Error generating image for '{prompt_query}': {exc}")
+                    continue
+                if not image_bytes:
+                    continue
+
+                storage_name = generated_storage_name(prompt_tokens)
+                images = upload_with_variants(storage_name, image_bytes)
+                del image_bytes
+                if not images:
+                    continue
+                save_image_metadata(storage_name, prompt_tokens, images["full"], images=images)
+                generation_cache.store(futures[future], images["full"], storage_name, prompt_tokens)
+
+                sent += 1
+                yield "outfit", {
+                    "name": f"GENERATED_{storage_name}",
+                    "image": pick_variant(images, max_width, formats) or images["full"],
+                    "tags": prompt_tokens,
+                    "source_url": images["full"],
+                }
+        except FuturesTimeoutError:
+            timed_out = True
+        finally:
+            # Past the deadline or after the client went away, finished
+            # images still go to the catalog.
+            for future in futures:
+                if future not in handled and not future.cancel():
+                    future.add_done_callback(
+                        lambda finished, key=futures[future]: persist_generated_future(finished, prompt_tokens, key)
+                    )
+        yield "done", {"count": sent, "requested": image_count, "timedOut": timed_out}
+
+    return stream_events(events(), wants_sse(request))
+
+def recommend_item(doc: dict, url: str, max_width: int | None, formats: set[str]) -> dict:
+    return {
+        "name": doc.get("filename"),
+        "image": display_image_url(doc, url, max_width, formats),
+        "tags": doc.get("tags", []),
+        "source_url": doc.get("source_url") or url,
+    }
+
+def recommend_outfits(request, data: dict) -> tuple[dict, dict]:
+    """
+    Stored matches for a recommend request.  Also returns the context the
+    callers need afterwards: the generation job to submit (if any), the
+    required tags, display settings and the swipe session.
+    """
     styles = _collect_values(data, "styles", "style")
     body_shapes = _collect_values(data, "bodyShapes", "bodyShape")
     colours = _collect_values(data, "colours", "colour", "colors", "color")
@@ -733,12 +1653,7 @@ def recommend(request):
     else:
         city = None
 
-    token = get_auth_token(request)
-    user_id = None
-    if token:
-        decoded = decode_jwt(token)
-        if decoded:
-            user_id = str(decoded["user_id"])
+    user_id = request_auth(request).user_id
 
     style_tags = [str(k).strip().lower() for k in styles if k]
     body_shape_tags = [str(k).strip().lower() for k in body_shapes if k]
@@ -759,6 +1674,38 @@ def recommend(request):
     else:
         use_weather = bool(use_weather_value)
 
+    image_count = data.get('image_count', 4)
+    try:
+        image_count = int(image_count)
+    except (TypeError, ValueError):
+        image_count = 4
+    image_count = max(1, min(image_count, TOTAL_IMAGES))
+
+    exclude_names = set(_collect_values(data, "exclude_names", "excludeNames"))
+    swipe_session = swipe_sessions.open(data.get("session") or data.get("sessionToken"))
+
+    def is_seen(name) -> bool:
+        return name in exclude_names or (swipe_session is not None and name in swipe_session)
+
+    max_candidates = max(image_count * 4, 32)
+    max_width, formats = display_settings(request, data)
+
+    use_index = CATALOG_INDEX_ENABLED and catalog_index.ensure_ready()
+
+    def fetch_candidates(tags: set[str]):
+        if use_index:
+            # Unseen and repeat matches both require every tag, so the index
+            # only needs one newest-first walk.
+            return catalog_index.iter_matches(tags)
+        if swipe_session is not None:
+            # Bloom-filter hits can only be dropped here, so page on past
+            # them; the first page is read now (possibly speculatively).
+            pages = iter_recommend_pages(tags, exclude_names, max_candidates)
+            return chain(list(islice(pages, max_candidates)), pages)
+        return list(collection.aggregate(build_recommend_pipeline(
+            tags, exclude_names, image_count, window=max_candidates,
+        )))
+
     weather_info = {
         "requested": bool(use_weather),
         "applied": False,
@@ -772,6 +1719,7 @@ def recommend(request):
 
     preferred_weather = None
     weather_data = None
+    speculative = {}
     if use_weather:
         temp_value = None
         if temperature is not None:
@@ -788,7 +1736,23 @@ def recommend(request):
                 preferred_weather = None
                 temp_value = None
         if not preferred_weather:
-            weather_data = get_weather_bucket(city or "Sydney")
+            weather_city = city or "Sydney"
+            if (
+                not use_index
+                and os.getenv("WEATHER_API")
+                and weather_cache.peek(weather_city) is None
+            ):
+                # Weather is not cached: query the catalog for both buckets
+                # while the provider answers, so the miss costs
+                # max(weather, mongo) rather than their sum.
+                weather_future = _recommend_executor.submit(get_weather_bucket, weather_city)
+                for bucket in ("hot", "cold"):
+                    speculative[bucket] = _recommend_executor.submit(
+                        fetch_candidates, set(base_tags) | {bucket}
+                    )
+                weather_data = weather_future.result()
+            else:
+                weather_data = get_weather_bucket(weather_city)
             if weather_data:
                 bucket = weather_data.get("bucket")
                 if bucket:
@@ -807,33 +1771,8 @@ def recommend(request):
     else:
         weather_data = None
 
-    expanded_queries = expand_queries(base_tags)
     required_tags = set(base_tags)
 
-    image_count = data.get('image_count', 4)
-    try:
-        image_count = int(image_count)
-    except (TypeError, ValueError):
-        image_count = 4
-    image_count = max(1, min(image_count, TOTAL_IMAGES))
-
-    exclude_names = set(_collect_values(data, "exclude_names", "excludeNames"))
-
-    max_candidates = max(image_count * 4, 32)
-
-    query_conditions = []
-    if expanded_queries:
-        query_conditions.append({"tags": {"$in": expanded_queries}})
-    if preferred_weather:
-        query_conditions.append({"tags": preferred_weather})
-
-    if not query_conditions:
-        query_filter: dict[str, object] = {}
-    elif len(query_conditions) == 1:
-        query_filter = query_conditions[0]
-    else:
-        query_filter = {"$and": query_conditions}
-
     seen_names = set()
     seen_images = set()
     response_images = []
@@ -845,99 +1784,355 @@ def recommend(request):
             return False
         if filename in seen_names:
             return False
-        if not allow_repeat and filename in exclude_names:
+        if not allow_repeat and is_seen(filename):
             return False
 
-        url = None
-        images = doc.get("images") or {}
-        if isinstance(images, dict):
-            url = images.get("full") or images.get("thumbnail")
-        if not url:
-            url = doc.get("image")
-        if not url:
-            url = f"{PUBLIC_URL_BASE}{safe_filename(filename)}"
-
+        url = resolve_catalog_image_url(doc)
         if not url:
             return False
 
         if url in seen_images:
             return False
 
-        source_url = doc.get("source_url") or url
-
         tags = doc.get("tags") or []
         normalized_tags = {str(tag).strip().lower() for tag in tags if isinstance(tag, str)}
         if required_tags and not required_tags.issubset(normalized_tags):
             return False
 
-        response_images.append({
-            "name": filename,
-            "image": url,
-            "tags": doc.get("tags", []),
-            "source_url": source_url
-        })
+        response_images.append(recommend_item(doc, url, max_width, formats))
         seen_names.add(filename)
         seen_images.add(url)
         return len(response_images) >= image_count
 
-    for doc in collection.find(query_filter).sort("created_at", -1).limit(max_candidates):
+    if preferred_weather in speculative:
+        candidates = speculative[preferred_weather].result()
+    else:
+        candidates = fetch_candidates(required_tags)
+
+    repeat_docs = []
+    for doc in candidates:
+        if doc.get("tier") or is_seen(doc.get("filename")):
+            if len(repeat_docs) < image_count:
+                repeat_docs.append(doc)
+            continue
         if append_doc(doc):
             break
-
-    if len(response_images) < image_count:
-        fallback_conditions = [
-            {"filename": {"$nin": list(seen_names.union(exclude_names))}}
-        ]
-        if preferred_weather:
-            fallback_conditions.append({"tags": preferred_weather})
-        if len(fallback_conditions) == 1:
-            fallback_filter = fallback_conditions[0]
-        else:
-            fallback_filter = {"$and": fallback_conditions}
-        for doc in collection.find(fallback_filter).sort("created_at", -1).limit(max_candidates):
-            if append_doc(doc):
-                break
-
     if len(response_images) < image_count:
         unique_exhausted = True
-        repeat_conditions = []
-        if expanded_queries:
-            repeat_conditions.append({"tags": {"$in": expanded_queries}})
-        if preferred_weather:
-            repeat_conditions.append({"tags": preferred_weather})
-
-        if not repeat_conditions:
-            repeat_query: dict[str, object] = {}
-        elif len(repeat_conditions) == 1:
-            repeat_query = repeat_conditions[0]
-        else:
-            repeat_query = {"$and": repeat_conditions}
-        for doc in collection.find(repeat_query).sort("created_at", -1).limit(max_candidates):
+        for doc in repeat_docs:
             if append_doc(doc, allow_repeat=True):
-                if len(response_images) >= image_count:
-                    break
-        if len(response_images) < image_count:
-            for doc in collection.find({}).sort("created_at", -1).limit(max_candidates):
-                if append_doc(doc, allow_repeat=True):
-                    if len(response_images) >= image_count:
-                        break
+                break
 
     random.shuffle(response_images)
 
+    generation = None
     if base_tags and ENABLE_AI_GENERATION:
-        threading.Thread(
-            target=generate,
-            args=(base_tags, min(image_count, 2), user_id),
-            daemon=True
-        ).start()
+        generation = {
+            "tags": [tag for tag in base_tags if tag != preferred_weather],
+            "weather": preferred_weather,
+            "image_count": min(image_count, 2),
+            "user_id": user_id,
+        }
 
-    return JsonResponse({
+    payload = {
         "outfits": response_images[:image_count],
         "uniqueExhausted": unique_exhausted,
         "weather": weather_info,
-    })
+    }
+    if swipe_session is not None:
+        for item in payload["outfits"]:
+            swipe_session.add(item["name"])
+        swipe_sessions.save(swipe_session)
+        payload["session"] = swipe_session.token
+
+    return payload, {
+        "generation": generation,
+        "required_tags": required_tags,
+        "max_width": max_width,
+        "formats": formats,
+        "session": swipe_session,
+        "is_seen": is_seen,
+    }
+
+# Results depend on the swipe session and are sampled, and a miss can queue
+# generation, so responses are never reused.
+@cache_policy(NO_STORE)
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@authentication_classes([])
+@csrf_exempt
+def recommend(request):
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    payload, context = recommend_outfits(request, data)
+    if context["generation"]:
+        generation_scheduler.submit(**context["generation"])
+    return JsonResponse(payload)
+
+declare_query(
+    collection,
+    "recommend stream new images",
+    {"tags": {"$all": ["casual", "womenswear"]}, "created_at": {"$gt": datetime(2025, 1, 1)}},
+    sort=[("created_at", 1)],
+)
+def newly_generated(required_tags, since: datetime, limit: int) -> list[dict]:
+    """Matching images written after `since`, e.g. by another worker process."""
+    query = {"tags": {"$all": sorted(required_tags)}, "created_at": {"$gt": since}}
+    return list(
+        collection.find(query, {"_id": 0, "filename": 1, "tags": 1, "images": 1, "image": 1, "source_url": 1})
+        .sort("created_at", 1)
+        .limit(limit)
+    )
+
+@csrf_exempt
+async def recommend_stream(request):
+    """
+    Progressive `recommend` (run under ASGI).  Stored matches are sent as
+    the first event, then the connection stays open and outfits generated
+    for the same tags are pushed as they are saved, until the generation job
+    finishes or RECOMMEND_STREAM_SECONDS pass.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required"}, status=405)
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    payload, context = await sync_to_async(recommend_outfits, thread_sensitive=False)(request, data)
+    generation = context["generation"]
+    subscription = None
+    status = None
+    started_at = datetime.utcnow()
+    if generation:
+        # Subscribe before submitting so no outfit can be missed.
+        subscription = generation_events.subscribe(job_key(generation["tags"], generation["weather"]))
+        status = await sync_to_async(generation_scheduler.submit, thread_sensitive=False)(**generation)
+        if status == "rejected":
+            subscription.close()
+            subscription = None
+
+    async def events():
+        yield "outfits", payload
+        if subscription is None:
+            yield "done", {"generated": 0, "generation": status}
+            return
+
+        limit = generation["image_count"]
+        session = context["session"]
+        served = {item["name"] for item in payload["outfits"]}
+        generated = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + RECOMMEND_STREAM_SECONDS
+        try:
+            while len(generated) < limit:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                item = await subscription.get(min(remaining, RECOMMEND_STREAM_POLL_SECONDS))
+                if item is DONE:
+                    break
+                if item is None:
+                    # Nothing pushed in this process: the job may be running
+                    # in another worker, so look for its output in Mongo.
+                    docs = await sync_to_async(newly_generated, thread_sensitive=False)(
+                        context["required_tags"], started_at, limit
+                    )
+                else:
+                    docs = [item]
+                for doc in docs:
+                    filename = doc.get("filename")
+                    url = resolve_catalog_image_url(doc)
+                    if not filename or not url or filename in served or context["is_seen"](filename):
+                        continue
+                    served.add(filename)
+                    generated.append(filename)
+                    yield "outfit", recommend_item(doc, url, context["max_width"], context["formats"])
+        finally:
+            subscription.close()
+            if session is not None and generated:
+                for filename in generated:
+                    session.add(filename)
+                await sync_to_async(swipe_sessions.save, thread_sensitive=False)(session)
+        yield "done", {"generated": len(generated), "generation": status}
+
+    return stream_events(events(), wants_sse(request))
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def create_swipe_session(request):
+    """
+    Issue an opaque session token for `recommend` / `instant_outfits`.
+    Outfits served under the token are remembered server-side, so clients no
+    longer need to resend `exclude_names`.
+    """
+    session = swipe_sessions.create()
+    swipe_sessions.save(session)
+    return JsonResponse({"session": session.token, "ttl": SWIPE_SESSION_TTL_SECONDS}, status=201)
+
+
+def instant_vibe_terms(doc: dict) -> list[str]:
+    """
+    Normalized terms an `instantoutfit` document can be requested by: its
+    vibe and tags, plus the individual words in its tags and seed source.
+    Stored as `vibe_terms` (see the `normalize_instant_vibes` command).
+    """
+    terms: list[str] = []
+
+    def add(value: str) -> None:
+        text = value.strip().lower()
+        if text and text not in terms:
+            terms.append(text)
+
+    values = []
+    if isinstance(doc.get("vibe"), str):
+        values.append(doc["vibe"])
+    if isinstance(doc.get("tags"), list):
+        values.extend(tag for tag in doc["tags"] if isinstance(tag, str))
+    for value in values:
+        add(value)
+    if isinstance(doc.get("seed_source"), str):
+        values.append(doc["seed_source"])
+    for value in values:
+        for word in re.findall(r"[a-z0-9]+", value.lower()):
+            add(word)
+    return terms
+
+INSTANT_PROJECTION = {
+    "filename": 1,
+    "name": 1,
+    "title": 1,
+    "tags": 1,
+    "source_url": 1,
+    "image": 1,
+    "url": 1,
+    "images.source_url": 1,
+    "images.full": 1,
+    "images.url": 1,
+    "images.main": 1,
+    "images.primary": 1,
+    "images.square": 1,
+}
+
+def resolve_instant_name(doc: dict) -> str:
+    for key in ("filename", "name", "title"):
+        value = doc.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    identifier = doc.get("_id")
+    return str(identifier) if identifier is not None else ""
+
+def resolve_instant_image_url(doc: dict) -> str:
+    images_data = doc.get("images")
+    if isinstance(images_data, dict):
+        for key in ("source_url", "full", "url", "main", "primary", "square"):
+            candidate = images_data.get(key)
+            if isinstance(candidate, str) and candidate.strip():
+                return candidate
+    for key in ("source_url", "image", "url"):
+        candidate = doc.get(key)
+        if isinstance(candidate, str) and candidate.strip():
+            return candidate
+    return ""
+
+def instant_item(doc: dict) -> dict | None:
+    """The fields `instant_outfits` returns for a document, or None if it cannot be shown."""
+    name = resolve_instant_name(doc)
+    image_url = resolve_instant_image_url(doc)
+    if not name or not image_url:
+        return None
+    return {
+        "name": name,
+        "image": image_url,
+        "tags": doc.get("tags") if isinstance(doc.get("tags"), list) else [],
+        "source_url": doc.get("source_url") or image_url,
+    }
+
+instant_snapshot = InstantSnapshot(
+    instant_collection,
+    {**INSTANT_PROJECTION, "vibe": 1, "seed_source": 1},
+    instant_item,
+    instant_vibe_terms,
+    poll_interval=INSTANT_SNAPSHOT_POLL_SECONDS,
+)
+
+declare_index(instant_collection, [("vibe_terms", 1)])
+declare_query(instant_collection, "instant outfits by vibe", {"vibe_terms": "work"})
+declare_index(instant_collection, [("vibe_terms", 1), ("_id", 1)])
+declare_query(
+    instant_collection,
+    "instant outfits page",
+    {"vibe_terms": "work", "_id": {"$gt": ObjectId("0" * 24)}},
+    sort=[("_id", 1)],
+)
+def sample_instant_outfits(vibe: str, size: int, exclude_names=(), is_seen=None) -> list[dict]:
+    """
+    Up to `size` random instant outfit items for `vibe` (any when empty),
+    skipping excluded names and, given `is_seen(name)` (a swipe session),
+    names it has served.  Served from the in-memory snapshot once it is
+    loaded; until then (or with INSTANT_SNAPSHOT_ENABLED off) a `$sample`
+    over the indexed `vibe_terms` field, then, if that sample was all seen,
+    the remaining matches in `_id` order.
+    """
+    if INSTANT_SNAPSHOT_ENABLED and instant_snapshot.ensure_started():
+        return instant_snapshot.sample(vibe, size, exclude_names, is_seen)
+
+    match: dict[str, object] = {}
+    if vibe:
+        match["vibe_terms"] = vibe
+    if exclude_names:
+        names = list(exclude_names)
+        match["$nor"] = [{"filename": {"$in": names}}, {"name": {"$in": names}}]
+
+    def unseen(docs) -> list[dict]:
+        items = (instant_item(doc) for doc in docs)
+        return [item for item in items if item is not None and not (is_seen and is_seen(item["name"]))]
+
+    # Session hits can only be dropped here, so over-sample for them.
+    draw = max(size * 4, 24) if is_seen else size
+    pipeline = [{"$match": match}] if match else []
+    pipeline += [{"$sample": {"size": draw}}, {"$project": INSTANT_PROJECTION}]
+    docs = list(instant_collection.aggregate(pipeline))
+    items = unseen(docs)
+    if len(items) >= size or len(docs) < draw:
+        return items[:size]
+
+    sampled = {doc["_id"] for doc in docs}
+    position = None
+    while len(items) < size:
+        query = {**match, "_id": {"$gt": position}} if position is not None else match
+        page = list(instant_collection.find(query, INSTANT_PROJECTION).sort("_id", 1).limit(draw))
+        items.extend(unseen(doc for doc in page if doc["_id"] not in sampled))
+        if len(page) < draw:
+            break
+        position = page[-1]["_id"]
+    return items[:size]
 
 
+INSTANT_PERSONAL_PARAMS = ("session", "exclude")
+
+def instant_outfits_shareable(request) -> bool:
+    """A GET by vibe alone: any sample of the same snapshot is an equally good answer."""
+    return request.method == "GET" and not any(key in request.GET for key in INSTANT_PERSONAL_PARAMS)
+
+def instant_outfits_validator(request) -> str | None:
+    version = instant_snapshot.version if INSTANT_SNAPSHOT_ENABLED else None
+    if version is None or not instant_outfits_shareable(request):
+        return None
+    return f"instant:{version}:{request.GET.urlencode()}"
+
+@cache_policy(
+    lambda request: (
+        f"public, max-age={INSTANT_OUTFITS_CACHE_SECONDS}"
+        if instant_outfits_shareable(request) else NO_STORE
+    ),
+    validator=instant_outfits_validator,
+    weak=True,
+)
 @api_view(["GET", "POST"])
 @permission_classes([AllowAny])
 def instant_outfits(request):
@@ -982,112 +2177,100 @@ def instant_outfits(request):
     exclude_sources.extend(request.GET.getlist("exclude"))
 
     exclude_names = {name for name in exclude_sources if isinstance(name, str) and name.strip()}
+    swipe_session = swipe_sessions.open(
+        _extract_param(request_payload, "session", "sessionToken") or request.GET.get("session")
+    )
 
-    vibe_conditions = []
-    if vibe:
-        exact_match = {"vibe": vibe}
-        vibe_regex = {"$regex": vibe, "$options": "i"}
-        vibe_conditions = [
-            exact_match,
-            {"tags": vibe},
-            {"tags": vibe_regex},
-            {"seed_source": vibe_regex},
-        ]
-
-    if vibe_conditions:
-        match_query: dict[str, object] = {"$or": vibe_conditions}
-    else:
-        match_query = {}
+    def is_seen(name: str) -> bool:
+        return name in exclude_names or (swipe_session is not None and name in swipe_session)
 
-    primary_candidates = list(
-        instant_collection.find(match_query, projection=None)
+    candidates = sample_instant_outfits(
+        vibe, image_count, exclude_names, is_seen if swipe_session is not None else None
     )
-    random.shuffle(primary_candidates)
 
     response_items: list[dict[str, object]] = []
     response_names: set[str] = set()
 
-    def resolve_name(doc: dict) -> str:
-        for key in ("filename", "name", "title"):
-            value = doc.get(key)
-            if isinstance(value, str) and value.strip():
-                return value.strip()
-        identifier = doc.get("_id")
-        return str(identifier) if identifier is not None else ""
-
-    def resolve_image_url(doc: dict) -> str:
-        images_data = doc.get("images")
-        if isinstance(images_data, dict):
-            for key in ("source_url", "full", "url", "main", "primary", "square"):
-                candidate = images_data.get(key)
-                if isinstance(candidate, str) and candidate.strip():
-                    return candidate
-        for key in ("source_url", "image", "url"):
-            candidate = doc.get(key)
-            if isinstance(candidate, str) and candidate.strip():
-                return candidate
-        return ""
-
-    def append_doc(doc: dict, allow_repeat: bool = False) -> bool:
-        name = resolve_name(doc)
-        if not name:
-            return False
-
-        if not allow_repeat and (name in exclude_names or name in response_names):
+    def append_item(item: dict, allow_repeat: bool = False) -> bool:
+        name = item["name"]
+        if not allow_repeat and (is_seen(name) or name in response_names):
             return False
         if allow_repeat and name in response_names:
             return False
 
-        image_url = resolve_image_url(doc)
-        if not image_url:
-            return False
-
-        tags = doc.get("tags") if isinstance(doc.get("tags"), list) else []
-
-        response_items.append(
-            {
-                "name": name,
-                "image": image_url,
-                "tags": tags,
-                "source_url": doc.get("source_url") or image_url,
-                "vibe": vibe or (tags[0] if tags else None),
-            }
-        )
+        tags = item["tags"]
+        response_items.append({**item, "vibe": vibe or (tags[0] if tags else None)})
         response_names.add(name)
         if not allow_repeat:
             exclude_names.add(name)
         return len(response_items) >= image_count
 
-    fresh_candidates: list[dict] = []
-    for doc in primary_candidates:
-        name = resolve_name(doc)
-        if not name:
-            continue
-        if name in exclude_names:
-            continue
-        fresh_candidates.append(doc)
-
-    random.shuffle(fresh_candidates)
-
-    for doc in fresh_candidates:
-        if append_doc(doc):
+    for item in candidates:
+        if append_item(item):
             break
 
     unique_exhausted = False
 
-    if not response_items and primary_candidates:
-        unique_exhausted = True
-        for doc in primary_candidates:
-            if append_doc(doc, allow_repeat=True):
+    if not response_items:
+        # Everything matching has been seen: repeat from the whole pool.
+        repeats = sample_instant_outfits(vibe, image_count)
+        unique_exhausted = bool(repeats)
+        for item in repeats:
+            if append_item(item, allow_repeat=True):
                 break
 
-    return JsonResponse(
-        {
-            "outfits": response_items[:image_count],
-            "uniqueExhausted": unique_exhausted,
-            "requestedVibe": vibe,
-        }
-    )
+    payload = {
+        "outfits": response_items[:image_count],
+        "uniqueExhausted": unique_exhausted,
+        "requestedVibe": vibe,
+    }
+    if swipe_session is not None:
+        for item in payload["outfits"]:
+            swipe_session.add(item["name"])
+        swipe_sessions.save(swipe_session)
+        payload["session"] = swipe_session.token
+
+    return JsonResponse(payload)
+
+
+declare_index(early_access_collection, [("email", 1)], unique=True)
+declare_index(early_access_collection, [("created_at", -1), ("_id", -1)])
+declare_query(early_access_collection, "early access by email", {"email": "someone@example.com"})
+declare_query(early_access_collection, "early access newest first", {}, sort=[("created_at", -1), ("_id", -1)])
+declare_query(
+    early_access_collection,
+    "early access after cursor",
+    {"$or": [
+        {"created_at": {"$lt": datetime(2025, 1, 1)}},
+        {"created_at": datetime(2025, 1, 1), "_id": {"$lt": ObjectId("0" * 24)}},
+    ]},
+    sort=[("created_at", -1), ("_id", -1)],
+)
+early_access_total = CachedCount(early_access_collection.estimated_document_count, ttl=60)
+
+def encode_page_cursor(value: datetime, object_id) -> str:
+    """Opaque next-page token for keyset pagination on (timestamp, _id)."""
+    raw = json.dumps({"t": value.isoformat(), "i": str(object_id)})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_page_cursor(token: str | None):
+    """(timestamp, ObjectId) from `encode_page_cursor`, or None if the token is invalid."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), ObjectId(data["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        return None
+
+def keyset_after(field: str, position) -> dict:
+    """Filter for documents after `position` in (field desc, _id desc) order."""
+    value, object_id = position
+    return {"$or": [
+        {field: {"$lt": value}},
+        {field: value, "_id": {"$lt": object_id}},
+    ]}
 
 
 @api_view(["POST"])
@@ -1141,6 +2324,7 @@ def register_early_access(request):
             {"status": "error", "message": "Unable to save your registration right now."},
             status=500,
         )
+    early_access_total.adjust(1)
 
     return JsonResponse(
         {"status": "ok", "message": "Thanks! We'll be in touch soon."},
@@ -1154,6 +2338,11 @@ def register_early_access(request):
 def list_early_access(request):
     """
     Return paginated early-access registrations for the admin dashboard.
+
+    Pass the previous response's `next_cursor` as `cursor` to fetch the next
+    page by keyset on (created_at, _id); `page` (offset) is still accepted
+    for the first page and older clients.  `total` is an estimate refreshed
+    in the background.
     """
     permission_error = ensure_admin(request)
     if permission_error:
@@ -1171,18 +2360,28 @@ def list_early_access(request):
         page_size = 30
     page_size = max(1, min(page_size, MAX_EARLY_ACCESS_PAGE_SIZE))
 
-    total = early_access_collection.count_documents({})
-    skip = (page - 1) * page_size
-
-    cursor = (
-        early_access_collection.find({})
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(page_size)
-    )
+    cursor_token = request.GET.get("cursor")
+    position = decode_page_cursor(cursor_token)
+    if cursor_token and position is None:
+        return JsonResponse({"detail": "Invalid cursor."}, status=400)
+
+    cursor = early_access_collection.find(
+        keyset_after("created_at", position) if position else {},
+        {"email": 1, "consent": 1, "created_at": 1},
+    ).sort([("created_at", -1), ("_id", -1)])
+    if position is None and page > 1:
+        cursor = cursor.skip((page - 1) * page_size)
+    # One extra row tells whether another page exists.
+    docs = list(cursor.limit(page_size + 1))
+    next_cursor = None
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        last = docs[-1]
+        if isinstance(last.get("created_at"), datetime):
+            next_cursor = encode_page_cursor(last["created_at"], last["_id"])
 
     items = []
-    for doc in cursor:
+    for doc in docs:
         created_at = doc.get("created_at")
         items.append(
             {
@@ -1198,63 +2397,117 @@ def list_early_access(request):
             "items": items,
             "page": page,
             "page_size": page_size,
-            "total": total,
+            "total": early_access_total.get(),
+            "next_cursor": next_cursor,
         }
     )
 
 
+EARLY_ACCESS_EXPORT_HEADER = ["Email", "Consent", "Registered At"]
+
+def early_access_export_rows():
+    """Export rows, newest first, read in batches with only the exported fields."""
+    cursor = (
+        early_access_collection.find({}, {"_id": 0, "email": 1, "consent": 1, "created_at": 1})
+        .sort("created_at", -1)
+        .batch_size(1000)
+    )
+    for doc in cursor:
+        created_at = doc.get("created_at")
+        yield [
+            doc.get("email", ""),
+            "Yes" if doc.get("consent") else "No",
+            created_at.strftime("%Y-%m-%d")
+            if isinstance(created_at, datetime)
+            else (created_at or ""),
+        ]
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
 @authentication_classes([])
 def export_early_access(request):
     """
-    Export all early-access registrations as an Excel workbook.
+    Export all early-access registrations as an Excel workbook, or as CSV
+    with `?filetype=csv`.  CSV rows are streamed as the cursor is read; the
+    workbook is built in openpyxl's write-only mode in a temporary file and
+    streamed from disk, so memory stays flat either way.  Both bodies are
+    async iterators so ASGI sends them as they are read.
     """
     permission_error = ensure_admin(request)
     if permission_error:
         return permission_error
 
-    cursor = early_access_collection.find({}).sort("created_at", -1)
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Early Access"
-    sheet.append(["Email", "Consent", "Registered At"])
+    stamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
 
-    for doc in cursor:
-        created_at = doc.get("created_at")
-        sheet.append(
-            [
-                doc.get("email", ""),
-                "Yes" if doc.get("consent") else "No",
-                created_at.strftime("%Y-%m-%d")
-                if isinstance(created_at, datetime)
-                else (created_at or ""),
-            ]
-        )
+    if request.GET.get("filetype") == "csv":
+        writer = csv.writer(_Echo())
+
+        async def lines():
+            yield writer.writerow(EARLY_ACCESS_EXPORT_HEADER)
+            # One cursor batch per trip to the worker thread.
+            async for row in iterate_in_thread(early_access_export_rows(), batch_size=1000):
+                yield writer.writerow(row)
 
-    stream = io.BytesIO()
+        response = StreamingHttpResponse(lines(), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="early_access_{stamp}.csv"'
+        return response
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Early Access")
+    sheet.append(EARLY_ACCESS_EXPORT_HEADER)
+    for row in early_access_export_rows():
+        sheet.append(row)
+
+    # Deleted as soon as the response closes it.
+    stream = tempfile.TemporaryFile()
     workbook.save(stream)
     stream.seek(0)
 
-    filename = f"early_access_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    response = HttpResponse(
-        stream.getvalue(),
+    response = FileResponse(
+        stream,
+        as_attachment=True,
+        filename=f"early_access_{stamp}.xlsx",
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    # Keeps the headers and file closer; ASGI would otherwise read the
+    # whole file into memory before sending it.
+    response.streaming_content = iterate_in_thread(
+        iter(lambda: stream.read(response.block_size), b"")
+    )
     return response
 
 
+def weather_city(request) -> str:
+    city = request.GET.get("city") or request.GET.get("location") or "Sydney"
+    if isinstance(city, str):
+        return city.strip() or "Sydney"
+    return "Sydney"
+
+def weather_validator(request) -> str | None:
+    """The cached reading for the city, if one is fresh (no provider call)."""
+    city = weather_city(request)
+    if not os.getenv("WEATHER_API"):
+        return None
+    # Counted here rather than in the view so 304s still feed the prefetcher.
+    weather_prefetcher.record(city)
+    weather_data = weather_cache.peek(city)
+    if not weather_data:
+        return None
+    return f"weather:{weather_cache.key(city)}:{weather_data.get('timestamp')}"
+
+@cache_policy(f"public, max-age={int(WEATHER_CACHE_TTL_SECONDS)}", validator=weather_validator)
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def weather_status(request):
-    city = request.GET.get("city") or request.GET.get("location") or "Sydney"
-    if isinstance(city, str):
-        city = city.strip() or "Sydney"
-    else:
-        city = "Sydney"
+    city = weather_city(request)
 
-    weather_data = get_weather_bucket(city)
+    weather_data = weather_cache.get(city) if os.getenv("WEATHER_API") else None
     if not weather_data:
         return JsonResponse(
             {
@@ -1278,3 +2531,33 @@ def weather_status(request):
             "fetched_at": weather_data.get("timestamp"),
         }
     )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@authentication_classes([])
+def service_metrics(request):
+    """
+    Return in-process cache and index counters for the admin dashboard.
+    Counters are per worker process.
+    """
+    permission_error = ensure_admin(request)
+    if permission_error:
+        return permission_error
+
+    return JsonResponse(
+        {
+            "pid": os.getpid(),
+            "weather_cache": weather_cache.stats(),
+            "weather_prefetch": weather_prefetcher.stats(),
+            "generation": generation_scheduler.stats(),
+            "generation_cache": generation_cache.stats(),
+            "instant_snapshot": instant_snapshot.stats(),
+            "auth_user_cache": user_cache.stats(),
+            "password_hashing": password_pool.stats(),
+            "early_access_total": early_access_total.stats(),
+            "recommend_streams": generation_events.stats(),
+            "r2_uploads": r2_uploader.stats(),
+            "catalog_index": catalog_index.stats(),
+        }
+    )
@@ -0,0 +1,258 @@
+"""
+Per-city cache in front of the weather provider.
+
+Fresh entries are served straight from memory.  Entries past their TTL but
+inside the stale window are served immediately while one background refresh
+runs (stale-while-revalidate).  Concurrent misses for the same city share a
+single upstream call, and when the provider is slow or down callers fall
+back to the last known bucket.
+"""
+import threading
+import time
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at")
+
+    def __init__(self, value, fetched_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class _Flight:
+    __slots__ = ("done", "value")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class WeatherCache:
+    def __init__(
+        self,
+        fetch,
+        ttl: float = 600,
+        stale_ttl: float = 3600,
+        error_ttl: float = 30,
+        fetch_timeout: float = 6,
+        stale_wait: float = 1,
+        max_entries: int = 1000,
+    ):
+        """
+        `fetch(city)` performs the upstream call and returns a dict or None.
+        Failed lookups are remembered for `error_ttl` seconds so a provider
+        outage is not hammered by every request.
+        """
+        self._fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.error_ttl = error_ttl
+        self.fetch_timeout = fetch_timeout
+        self.stale_wait = stale_wait
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._failures: dict[str, float] = {}
+        self._flights: dict[str, _Flight] = {}
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "coalesced": 0,
+            "fallbacks": 0,
+            "upstream_calls": 0,
+            "upstream_errors": 0,
+        }
+
+    @staticmethod
+    def key(city: str) -> str:
+        return (city or "").strip().lower()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _run_flight(self, key: str, city: str, flight: _Flight) -> None:
+        started = time.monotonic()
+        try:
+            value = self._fetch(city)
+        except Exception as exc:
+            print(f"[DEBUG] Weather fetch for '{city}' raised: {exc}")
+            value = None
+        with self._lock:
+            self._counters["upstream_calls"] += 1
+            if value is not None:
+                self._entries.pop(key, None)
+                self._entries[key] = _Entry(value, time.monotonic())
+                self._failures.pop(key, None)
+                while len(self._entries) > self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            else:
+                self._counters["upstream_errors"] += 1
+                self._failures[key] = time.monotonic()
+            self._flights.pop(key, None)
+        flight.value = value
+        flight.done.set()
+        elapsed = time.monotonic() - started
+        if elapsed > 2:
+            print(f"[DEBUG] Weather fetch for '{city}' took {elapsed:.1f}s")
+
+    def _start_flight(self, key: str, city: str) -> tuple[_Flight, bool]:
+        """Return the in-flight lookup for `key`, starting one if needed."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+        threading.Thread(target=self._run_flight, args=(key, city, flight), daemon=True).start()
+        return flight, True
+
+    def peek(self, city: str):
+        """Return the cached value for `city` if it is still fresh, without I/O."""
+        key = self.key(city)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.monotonic() - entry.fetched_at < self.ttl:
+            return entry.value
+        return None
+
+    def age(self, city: str) -> float | None:
+        with self._lock:
+            entry = self._entries.get(self.key(city))
+        return time.monotonic() - entry.fetched_at if entry else None
+
+    def refresh(self, city: str, wait: bool = False):
+        """Refresh `city` from the provider (coalesced with any in-flight call)."""
+        flight, _ = self._start_flight(self.key(city), city)
+        if wait:
+            flight.done.wait(self.fetch_timeout)
+            return flight.value
+        return None
+
+    def get(self, city: str):
+        key = self.key(city)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            failed_at = self._failures.get(key)
+
+        if entry is not None:
+            age = now - entry.fetched_at
+            if age < self.ttl:
+                self._count("hits")
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale")
+                self._start_flight(key, city)
+                return entry.value
+
+        if failed_at is not None and now - failed_at < self.error_ttl:
+            self._count("fallbacks")
+            return entry.value if entry else None
+
+        self._count("misses")
+        flight, started = self._start_flight(key, city)
+        if not started:
+            self._count("coalesced")
+        flight.done.wait(self.stale_wait if entry else self.fetch_timeout)
+        if flight.value is not None:
+            return flight.value
+        if entry is not None:
+            self._count("fallbacks")
+            return entry.value
+        return None
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["in_flight"] = len(self._flights)
+        lookups = stats["hits"] + stats["stale"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["stale"]) / lookups, 4) if lookups else None
+        stats["ttl"] = self.ttl
+        stats["stale_ttl"] = self.stale_ttl
+        return stats
+
+
+class WeatherPrefetcher:
+    """
+    Track the most requested cities and refresh their cache entries shortly
+    before they expire, so request paths keep hitting memory.
+
+    Runs on its own daemon thread, started on the first recorded request.
+    The tracked set is bounded: once it grows past `4 * top_n` cities all
+    counts are halved and the coldest cities are dropped.
+    """
+
+    def __init__(self, cache: WeatherCache, top_n: int = 20, refresh_ahead: float = 0.8, interval: float | None = None):
+        self.cache = cache
+        self.top_n = top_n
+        self.refresh_ahead = refresh_ahead
+        self.interval = interval or max(5.0, min(60.0, cache.ttl / 4))
+        self.max_tracked = max(top_n * 4, 16)
+
+        self._lock = threading.Lock()
+        self._counts: dict[str, list] = {}
+        self._thread: threading.Thread | None = None
+        self._refreshes = 0
+
+    def record(self, city: str) -> None:
+        if self.top_n <= 0:
+            return
+        key = self.cache.key(city)
+        if not key:
+            return
+        with self._lock:
+            tracked = self._counts.get(key)
+            if tracked is None:
+                if len(self._counts) >= self.max_tracked:
+                    self._decay()
+                tracked = self._counts[key] = [0, city]
+            tracked[0] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="weather-prefetch", daemon=True)
+                self._thread.start()
+
+    def _decay(self) -> None:
+        for tracked in self._counts.values():
+            tracked[0] //= 2
+        ranked = sorted(self._counts.items(), key=lambda item: item[1][0], reverse=True)
+        self._counts = dict(ranked[: self.max_tracked // 2])
+
+    def hot_cities(self) -> list[str]:
+        with self._lock:
+            ranked = sorted(self._counts.values(), key=lambda tracked: tracked[0], reverse=True)
+        return [city for _, city in ranked[: self.top_n]]
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh_due()
+            except Exception as exc:
+                print(f"[DEBUG] Weather prefetch failed: {exc}")
+
+    def refresh_due(self) -> int:
+        """Start refreshes for hot cities that are missing or close to expiry."""
+        started = 0
+        threshold = self.cache.ttl * self.refresh_ahead
+        for city in self.hot_cities():
+            age = self.cache.age(city)
+            if age is None or age >= threshold:
+                self.cache.refresh(city)
+                started += 1
+        with self._lock:
+            self._refreshes += started
+        return started
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            tracked = len(self._counts)
+            refreshes = self._refreshes
+        return {
+            "tracked": tracked,
+            "hot": self.hot_cities(),
+            "refreshes": refreshes,
+            "interval": self.interval,
+        }
@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { Download, Loader2, LogIn, ShieldAlert } from "lucide-react";
 import { Link } from "react-router-dom";
 import { useAuth } from "../contexts/AuthContext";
@@ -37,6 +37,9 @@ export default function AdminPage() {
   const [error, setError] = useState<string | null>(null);
   const [exportError, setExportError] = useState<string | null>(null);
   const [exporting, setExporting] = useState(false);
+  const [hasNextPage, setHasNextPage] = useState(false);
+  // cursors[n] is the keyset token that loads page n + 1; page 1 needs none.
+  const cursors = useRef<(string | null)[]>([null]);
 
   const isAdmin = user?.isAdmin === true;
   const totalPages = useMemo(
@@ -59,6 +62,7 @@ export default function AdminPage() {
     if (!isAdmin) {
       setEntries([]);
       setTotal(0);
+      cursors.current = [null];
       return;
     }
 
@@ -70,8 +74,12 @@ export default function AdminPage() {
       setError(null);
 
       try {
+        const cursor = cursors.current[page - 1];
+        const query = cursor
+          ? `cursor=${encodeURIComponent(cursor)}`
+          : `page=${page}`;
         const response = await fetch(
-          apiUrl(`/api/early_access/list/?page=${page}&page_size=${PAGE_SIZE}`),
+          apiUrl(`/api/early_access/list/?${query}&page_size=${PAGE_SIZE}`),
           {
             headers: buildAuthHeaders(user?.token),
             signal: controller.signal,
@@ -90,6 +98,7 @@ export default function AdminPage() {
           total?: number;
           page?: number;
           page_size?: number;
+          next_cursor?: string | null;
         };
 
         if (cancelled) return;
@@ -102,6 +111,8 @@ export default function AdminPage() {
 
         setEntries(Array.isArray(payload.items) ? payload.items : []);
         setTotal(nextTotal);
+        cursors.current[page] = payload.next_cursor ?? null;
+        setHasNextPage(Boolean(payload.next_cursor));
 
         if (nextTotal && page > nextTotalPages) {
           setPage(nextTotalPages);
@@ -307,7 +318,7 @@ export default function AdminPage() {
             <button
               type="button"
               onClick={() => setPage((prev) => prev + 1)}
-              disabled={page >= totalPages || loading}
+              disabled={!hasNextPage || loading}
               className="rounded-full border border-white/20 px-4 py-2 font-medium text-white transition hover:border-white/40 disabled:cursor-not-allowed disabled:opacity-60"
             >
               Next
@@ -1,4 +1,4 @@
-import { useCallback, useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { useAuth } from "../contexts/AuthContext";
 import { apiUrl } from "../lib/api";
@@ -10,6 +10,15 @@ type WardrobeItem = {
   tags?: string[];
 };
 
+function toWardrobeItem(item: any): WardrobeItem {
+  return {
+    id: item.name, // or item._id if you store it
+    name: item.name,
+    image: item.image, // <-- directly from backend
+    tags: item.tags ?? [],
+  };
+}
+
 export default function WardrobePage() {
   const { user } = useAuth();
   const navigate = useNavigate();
@@ -23,6 +32,9 @@ export default function WardrobePage() {
   const [actionFeedback, setActionFeedback] = useState<
     { type: "success" | "error"; message: string } | null
   >(null);
+  // Wardrobe version of the last full load or sync; later refreshes ask the
+  // backend only for what changed since then.
+  const syncVersion = useRef<{ token: string; version: number } | null>(null);
 
   useEffect(() => {
     if (!actionFeedback) return;
@@ -92,27 +104,67 @@ export default function WardrobePage() {
     setError(null);
 
     try {
-      const response = await fetch(apiUrl("/api/get_wardrobe/"), {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
-
-      if (response.status === 401) {
-        navigate("/login", { replace: true, state: { from: "/wardrobe" } });
+      const synced = syncVersion.current;
+      if (synced && synced.token === token) {
+        const response = await fetch(
+          apiUrl(`/api/get_wardrobe/?since=${synced.version}`),
+          { headers: { Authorization: `Bearer ${token}` } },
+        );
+        if (response.status === 401) {
+          navigate("/login", { replace: true, state: { from: "/wardrobe" } });
+          return;
+        }
+        const payload = await response.json().catch(() => ({}));
+        if (!response.ok || typeof payload?.version !== "number") {
+          throw new Error("Unable to sync wardrobe");
+        }
+        const deleted = new Set<string>(
+          Array.isArray(payload.deleted) ? payload.deleted : [],
+        );
+        const added: WardrobeItem[] = Array.isArray(payload.added)
+          ? payload.added.map(toWardrobeItem)
+          : [];
+        const addedNames = new Set(added.map((item) => item.name));
+        setItems((prev) => [
+          ...added.reverse(),
+          ...prev.filter(
+            (item) => !deleted.has(item.name) && !addedNames.has(item.name),
+          ),
+        ]);
+        syncVersion.current = { token, version: payload.version };
         return;
       }
 
-      const payload = await response.json().catch(() => ({}));
-      const wardrobe = Array.isArray(payload?.wardrobe)
-      ? (payload.wardrobe as any[]).map(item => ({
-          id: item.name, // or item._id if you store it
-          name: item.name,
-          image: item.image, // <-- directly from backend
-          tags: item.tags ?? [],
-        }))
-      : [];
+      // The wardrobe is served in pages; follow next_cursor until the end.
+      const wardrobe: WardrobeItem[] = [];
+      let version: number | null = null;
+      let cursor: string | null = null;
+      do {
+        const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+        const response = await fetch(apiUrl(`/api/get_wardrobe/${query}`), {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+        });
+
+        if (response.status === 401) {
+          navigate("/login", { replace: true, state: { from: "/wardrobe" } });
+          return;
+        }
+
+        const payload = await response.json().catch(() => ({}));
+        if (Array.isArray(payload?.wardrobe)) {
+          wardrobe.push(...(payload.wardrobe as any[]).map(toWardrobeItem));
+        }
+        // Keep the first page's version: anything changed mid-load is
+        // picked up again by the next sync.
+        if (version === null && typeof payload?.version === "number") {
+          version = payload.version;
+        }
+        cursor = typeof payload?.next_cursor === "string" ? payload.next_cursor : null;
+      } while (cursor);
       setItems(wardrobe);
+      syncVersion.current = version === null ? null : { token, version };
     } catch (err) {
       console.error("Failed to load wardrobe", err);
       setError("Unable to load your wardrobe. Please try again.");